@@ -0,0 +1,80 @@
+"""
+Author: Manuel Borregales
+
+Throughput of itinerary booking under contention.
+
+Several threads book and cancel two-leg itineraries on a small set of
+flights, picking random seats, so legs often collide with each other.
+
+Usage:
+    PYTHONPATH=$(pwd) python benchmarks/bench_itinerary.py [threads] [bookings_per_thread]
+"""
+
+import collections
+import random
+import sys
+import threading
+import time
+
+from src.aircraft import Airbus, Boeing
+from src.flight import Flight
+from src.itinerary import ItineraryBooker
+
+def random_seat(rng, num_rows, letters):
+    return f"{rng.randint(1, num_rows)}{rng.choice(letters)}"
+
+def layout(flight):
+    seating = flight.get_seating()
+    return len(seating) - 1, "".join(seating[1])
+
+def worker(booker, flights, bookings, seed, results, outstanding=5):
+    rng = random.Random(seed)
+    booked = conflicts = 0
+    itineraries = collections.deque()
+    passenger = ("Passenger", f"Thread{seed}", f"{seed:08d}T")
+    for _ in range(bookings):
+        first, second = rng.sample(flights, 2)
+        legs = [
+            (first, random_seat(rng, *layout(first))),
+            (second, random_seat(rng, *layout(second))),
+        ]
+        try:
+            booker.book(passenger, legs)
+        except ValueError:
+            conflicts += 1
+            continue
+        booked += 1
+        # Cancel the oldest itineraries so the flights never fill up.
+        itineraries.append(legs)
+        if len(itineraries) > outstanding:
+            booker.cancel(passenger, itineraries.popleft())
+    results.append((booked, conflicts))
+
+def run(num_threads=8, bookings=5000):
+    flights = [
+        Flight(number="BA117", aircraft=Airbus(registration="G-EUAH", variant="A319-100")),
+        Flight(number="BA148", aircraft=Airbus(registration="G-EUPT", variant="A319-100")),
+        Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates")),
+    ]
+    booker = ItineraryBooker()
+    results = []
+    threads = [
+        threading.Thread(target=worker, args=(booker, flights, bookings, seed, results))
+        for seed in range(num_threads)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    booked = sum(result[0] for result in results)
+    conflicts = sum(result[1] for result in results)
+    attempts = num_threads * bookings
+    print(f"{num_threads} threads, {attempts} itineraries: {booked} booked, {conflicts} conflicts")
+    print(f"{elapsed:.3f} s, {attempts / elapsed:,.0f} itineraries/s")
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,49 @@
+"""
+Author: Manuel Borregales
+
+Churn simulation for the waitlist on a full Boeing 777 flight.
+
+Every step cancels a random seated passenger, which promotes the next
+waitlisted passenger, and then waitlists a new passenger.
+
+Usage:
+    PYTHONPATH=$(pwd) python benchmarks/bench_waitlist.py [steps] [waitlist_size]
+"""
+
+import random
+import sys
+import time
+
+from src.aircraft import Boeing
+from src.flight import Flight
+from src.waitlist import Waitlist
+
+def make_passenger(i):
+    return ("Passenger", f"Number{i}", f"{i:08d}P")
+
+def run(steps=50000, waitlist_size=10000, seed=42):
+    rng = random.Random(seed)
+    flight = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"))
+    waitlist = Waitlist(flight)
+
+    next_id = 0
+    seats = []
+    while flight.num_available_seats() > 0:
+        seats.append(waitlist.request_seat(make_passenger(next_id)))
+        next_id += 1
+    for _ in range(waitlist_size):
+        waitlist.request_seat(make_passenger(next_id), tier=rng.randrange(3))
+        next_id += 1
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        flight.deallocate_passenger(rng.choice(seats))
+        waitlist.request_seat(make_passenger(next_id), tier=rng.randrange(3))
+        next_id += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{steps} cancellations with {waitlist.get_size()} waitlisted passengers on {len(seats)} seats")
+    print(f"{elapsed:.3f} s, {steps / elapsed:,.0f} promotions/s, {elapsed / steps * 1e6:.1f} us/promotion")
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
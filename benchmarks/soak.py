@@ -0,0 +1,258 @@
+"""
+Author: Manuel Borregales
+
+Booking traffic replay and soak test.
+
+A trace is a JSONL file with one operation per line. The flights are
+declared first and the booking operations refer to them by number:
+
+    {"op": "flight", "number": "BA117", "aircraft": {"type": "airbus", "registration": "G-EUAH", "variant": "A319-100"}}
+    {"op": "allocate", "flight": "BA117", "seat": "12A", "passenger": ["Jack", "Shephard", "85994003S"]}
+    {"op": "reallocate", "flight": "BA117", "from": "12A", "to": "14C"}
+    {"op": "cancel", "flight": "BA117", "seat": "14C"}
+    {"op": "render", "flight": "BA117"}
+
+Aircraft are described as in manifests, see src/manifest.py.
+
+The replay loops over the trace, rebuilding the flights on every pass,
+until the duration has elapsed. Every interval it reports the throughput,
+the latency percentiles and the traced memory, so leaks and slowdowns
+show up as growth between intervals. Growth is measured from a baseline
+taken after one unmeasured warm-up pass, and the harness keeps its own
+memory constant so that it does not show up as growth.
+
+With --keep-flights the flights are built once and kept across passes, so
+state that builds up inside a flight shows up as growth. Operations that do
+not apply to the state left by the previous pass are counted as errors,
+unless the trace ends in the state it starts from: generate such a trace
+with --reset, which cancels every remaining booking at the end.
+
+Usage:
+    PYTHONPATH=$(pwd) python benchmarks/soak.py generate trace.jsonl [--flights N] [--operations N] [--seed N] [--reset]
+    PYTHONPATH=$(pwd) python benchmarks/soak.py replay trace.jsonl [--duration SECONDS] [--interval SECONDS] [--keep-flights]
+"""
+
+import argparse
+import contextlib
+from array import array
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from src.flight import Flight
+from src.manifest import make_aircraft
+
+OPERATIONS = ("allocate", "reallocate", "cancel", "render")
+
+def generate(path, num_flights=20, num_operations=100000, seed=42, reset=False):
+    """Writes a random but consistent trace of booking operations.
+
+    With reset, the trace ends by cancelling every remaining booking, so it
+    can be replayed repeatedly on the same flights.
+    """
+    rng = random.Random(seed)
+    specs = [
+        {"type": "airbus", "registration": "G-EUAH", "variant": "A319-100"},
+        {"type": "boeing", "registration": "F-GSPS", "airline": "Emirates"},
+        {"type": "aircraft", "registration": "G-EUPT", "model": "Airbus A319", "num_rows": 22, "num_seats_per_row": 6},
+    ]
+
+    with open(path, "w") as trace:
+        # Maps each flight number to all of its seats and the occupied ones.
+        flights = {}
+        for i in range(num_flights):
+            number = f"BA{i + 1}"
+            spec = specs[i % len(specs)]
+            flight = Flight(number, make_aircraft(spec))
+            seats = [f"{row}{letter}" for row, letters in enumerate(flight.get_seating()) if letters for letter in letters]
+            flights[number] = (seats, set())
+            trace.write(json.dumps({"op": "flight", "number": number, "aircraft": spec}) + "\n")
+
+        numbers = list(flights)
+        for i in range(num_operations):
+            number = rng.choice(numbers)
+            seats, occupied = flights[number]
+            op = rng.choices(OPERATIONS, weights=(5, 2, 3, 1))[0]
+            if op != "render" and not occupied:
+                op = "allocate"
+            if op in ("allocate", "reallocate") and len(occupied) == len(seats):
+                op = "cancel"
+
+            if op == "allocate":
+                seat = rng.choice([seat for seat in seats if seat not in occupied])
+                occupied.add(seat)
+                record = {"seat": seat, "passenger": ["Passenger", f"Number{i}", f"{i % 10 ** 8:08d}P"]}
+            elif op == "reallocate":
+                from_seat = rng.choice(sorted(occupied))
+                to_seat = rng.choice([seat for seat in seats if seat not in occupied])
+                occupied.remove(from_seat)
+                occupied.add(to_seat)
+                record = {"from": from_seat, "to": to_seat}
+            elif op == "cancel":
+                seat = rng.choice(sorted(occupied))
+                occupied.remove(seat)
+                record = {"seat": seat}
+            else:
+                record = {}
+            trace.write(json.dumps({"op": op, "flight": number, **record}) + "\n")
+
+        if reset:
+            for number, (_, occupied) in flights.items():
+                for seat in sorted(occupied):
+                    trace.write(json.dumps({"op": "cancel", "flight": number, "seat": seat}) + "\n")
+
+def load_trace(path):
+    """Reads a trace, returning its flight declarations and booking operations."""
+    declarations, operations = [], []
+    with open(path) as trace:
+        for line in trace:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["op"] == "flight":
+                declarations.append(record)
+            elif record["op"] in OPERATIONS:
+                operations.append(record)
+            else:
+                raise ValueError(f"Unknown operation {record['op']}")
+    return declarations, operations
+
+def build_flights(declarations):
+    """Builds the flights declared in a trace, by flight number."""
+    return {record["number"]: Flight(record["number"], make_aircraft(record["aircraft"]))
+            for record in declarations}
+
+def apply(flights, record, sink):
+    """Applies one booking operation to its flight."""
+    flight = flights[record["flight"]]
+    op = record["op"]
+    if op == "allocate":
+        flight.allocate_passenger(record["seat"], tuple(record["passenger"]))
+    elif op == "reallocate":
+        flight.reallocate_passenger(record["from"], record["to"])
+    elif op == "cancel":
+        flight.deallocate_passenger(record["seat"])
+    else:
+        with contextlib.redirect_stdout(sink):
+            flight.print_seating()
+            flight.print_boarding_cards()
+        sink.seek(0)
+        sink.truncate()
+
+def percentiles(latencies):
+    """Gets the 50th, 95th and 99th percentiles of a list of latencies."""
+    if not latencies:
+        return 0.0, 0.0, 0.0
+    latencies = sorted(latencies)
+    last = len(latencies) - 1
+    return tuple(latencies[round(last * q)] for q in (0.50, 0.95, 0.99))
+
+def replay(path, duration=60.0, interval=5.0, reservoir_size=10000, seed=42, keep_flights=False):
+    """Replays a trace until the duration has elapsed and reports on the way."""
+    declarations, operations = load_trace(path)
+    if not operations:
+        raise ValueError("The trace has no booking operations.")
+
+    rng = random.Random(seed)
+    sink = io.StringIO()
+    # A bounded sample of every latency, allocated upfront so the report
+    # itself does not grow.
+    reservoir = array("d", bytes(8 * reservoir_size))
+    interval_latencies = []
+    total_ops = errors = passes = 0
+
+    tracemalloc.start()
+    # Warm up first, so caches and the state of the flights at the end of a
+    # pass are part of the baseline rather than reported as growth.
+    flights = build_flights(declarations)
+    for record in operations:
+        try:
+            apply(flights, record, sink)
+        except ValueError:
+            pass
+    baseline = tracemalloc.get_traced_memory()[0]
+    print(f"{'elapsed':>8} {'ops/s':>10} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8} {'memory KiB':>11} {'growth KiB':>11}")
+
+    start = last_report = time.perf_counter()
+    now = start
+    while now - start < duration:
+        if not keep_flights:
+            flights = build_flights(declarations)
+        passes += 1
+        for record in operations:
+            op_start = time.perf_counter()
+            try:
+                apply(flights, record, sink)
+            except ValueError:
+                errors += 1
+            now = time.perf_counter()
+            latency = now - op_start
+
+            total_ops += 1
+            interval_latencies.append(latency)
+            if total_ops <= reservoir_size:
+                reservoir[total_ops - 1] = latency
+            else:
+                slot = rng.randrange(total_ops)
+                if slot < reservoir_size:
+                    reservoir[slot] = latency
+
+            if now - last_report >= interval:
+                report(now - start, interval_latencies, now - last_report, baseline)
+                last_report = now
+            if now - start >= duration:
+                break
+
+    if interval_latencies:
+        report(now - start, interval_latencies, now - last_report, baseline)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50, p95, p99 = percentiles(reservoir[:total_ops])
+    elapsed = now - start
+    print(f"{total_ops} operations in {elapsed:.1f} s over {passes} passes, {errors} errors")
+    print(f"{total_ops / elapsed:,.0f} ops/s, p50 {p50 * 1e6:.1f} us, p95 {p95 * 1e6:.1f} us, p99 {p99 * 1e6:.1f} us, peak memory {peak / 1024:,.0f} KiB")
+    if total_ops and errors / total_ops > 0.01:
+        print(f"warning: {errors / total_ops:.0%} of the operations failed and are included in the latencies. "
+              "Replay with --keep-flights only traces that end in their starting state (generate --reset).",
+              file=sys.stderr)
+
+def report(elapsed, latencies, window, baseline):
+    """Prints one line of the periodic report and empties the interval latencies."""
+    p50, p95, p99 = percentiles(latencies)
+    num_ops = len(latencies)
+    # Empty the latencies before measuring, so they are not counted as growth.
+    latencies.clear()
+    current = tracemalloc.get_traced_memory()[0]
+    print(f"{elapsed:8.1f} {num_ops / window:10,.0f} {p50 * 1e6:8.1f} {p95 * 1e6:8.1f} {p99 * 1e6:8.1f} "
+          f"{current / 1024:11,.0f} {(current - baseline) / 1024:11,.0f}", flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Booking traffic replay and soak test.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="write a random trace")
+    generate_parser.add_argument("trace")
+    generate_parser.add_argument("--flights", type=int, default=20)
+    generate_parser.add_argument("--operations", type=int, default=100000)
+    generate_parser.add_argument("--seed", type=int, default=42)
+    generate_parser.add_argument("--reset", action="store_true",
+                                 help="cancel every remaining booking at the end, for replays with --keep-flights")
+
+    replay_parser = subparsers.add_parser("replay", help="replay a trace and report")
+    replay_parser.add_argument("trace")
+    replay_parser.add_argument("--duration", type=float, default=60.0, help="seconds to run for")
+    replay_parser.add_argument("--interval", type=float, default=5.0, help="seconds between reports")
+    replay_parser.add_argument("--keep-flights", action="store_true", help="keep the flights across passes")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        generate(args.trace, args.flights, args.operations, args.seed, args.reset)
+    else:
+        replay(args.trace, args.duration, args.interval, keep_flights=args.keep_flights)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""
+Author: Manuel Borregales
+
+Runs the command-line entry point, e.g. `python -m src availability manifest.jsonl`.
+"""
+
+import sys
+
+from src.cli import main
+
+sys.exit(main())
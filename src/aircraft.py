@@ -9,17 +9,21 @@ Classes:
     Boeing: Represents a Boeing 777 aircraft.
 """
 
-import string
+from src.cabin import CabinConfiguration
 
 class Aircraft:
-    def __init__(self, registration, model, num_rows, num_seats_per_row):
+    def __init__(self, registration, model, num_rows=None, num_seats_per_row=None, cabin=None):
         """Initializes an Aircraft instance.
         
+        The cabin is either a uniform grid of `num_rows` by `num_seats_per_row`
+        seats or, for zones, blocked seats and skipped rows, a cabin configuration.
+        
         Args:
             registration (str): The registration number of the aircraft.
             model (str): The model of the aircraft.
             num_rows (int): The number of rows in the aircraft.
             num_seats_per_row (int): The number of seats per row.
+            cabin (CabinConfiguration): The cabin configuration, instead of the number of rows and seats.
         """
 
         try:
@@ -28,17 +32,26 @@ class Aircraft:
             print(e)
             raise
 
-        if not isinstance(num_rows, int) or not isinstance(num_seats_per_row, int):
-            raise ValueError("Number of rows and seats per row must be integers.")
-        if num_rows <= 0 or num_seats_per_row <= 0:
-            raise ValueError("Number of rows and seats per row must be positive integers.")
+        if cabin is None:
+            if not isinstance(num_rows, int) or not isinstance(num_seats_per_row, int):
+                raise ValueError("Number of rows and seats per row must be integers.")
+            if num_rows <= 0 or num_seats_per_row <= 0:
+                raise ValueError("Number of rows and seats per row must be positive integers.")
+            cabin = CabinConfiguration.uniform(num_rows, num_seats_per_row)
+        else:
+            if num_rows is not None or num_seats_per_row is not None:
+                raise ValueError("Give either a cabin or the number of rows and seats per row, not both.")
+            if not isinstance(cabin, CabinConfiguration):
+                raise ValueError("Cabin must be a CabinConfiguration.")
         if not isinstance(model, str):
             raise ValueError("Model must be a string.")
         
         self.__registration = registration
         self.__model = model
-        self.__num_rows = num_rows
-        self.__num_seats_per_row = num_seats_per_row
+        self.__cabin = cabin
+        self.__compiled_cabin = cabin.compile()
+        self.__num_rows = self.__compiled_cabin.get_num_rows()
+        self.__num_seats_per_row = self.__compiled_cabin.get_max_seats_per_row()
     
     def get_registration(self):
         """Gets the registration number of the aircraft.
@@ -65,12 +78,28 @@ class Aircraft:
         return self.__num_rows
     
     def get_num_seats_per_row(self):
-        """Gets the number of seats per row.
+        """Gets the number of seats per row, or of the widest row if they differ.
         
         Returns:
             int: The number of seats per row.
         """
         return self.__num_seats_per_row
+
+    def get_cabin(self):
+        """Gets the cabin configuration of the aircraft.
+        
+        Returns:
+            CabinConfiguration: The cabin configuration.
+        """
+        return self.__cabin
+
+    def get_compiled_cabin(self):
+        """Gets the compiled seat index of the aircraft's cabin.
+        
+        Returns:
+            CompiledCabin: The compiled cabin, shared by aircraft with the same configuration.
+        """
+        return self.__compiled_cabin
     
     def seating_plan(self):
         """Generates the seating plan for the aircraft.
@@ -78,10 +107,11 @@ class Aircraft:
         Returns:
             tuple: A tuple containing:
                 - list: A list representing the rows (index 0 is None, followed by each row as a dict).
-                - str: A string of seat letters (e.g., 'ABCDEF').
+                - str: A string of seat letters (e.g., 'ABCDEF'), in the order they first appear in the cabin.
         """
         rows = [None] * (self.__num_rows + 1)  # Index 0 is set to None.
-        seats = string.ascii_uppercase[:self.__num_seats_per_row]
+        letters = "".join(zone_letters for _, _, _, zone_letters in self.__cabin.get_zones())
+        seats = "".join(dict.fromkeys(letters.replace(" ", "")))
         return rows, seats
 
     def num_seats(self):
@@ -90,7 +120,7 @@ class Aircraft:
         Returns:
             int: The total number of seats.
         """
-        return self.__num_rows * self.__num_seats_per_row
+        return self.__compiled_cabin.num_seats()
     
     def __verify_registration(self, registration):
         """Verifies that the registration number is valid. Returns false if
@@ -117,6 +147,8 @@ class Aircraft:
             raise ValueError("Registration must be six characters long.")
         
 class Airbus(Aircraft):
+    CABIN = CabinConfiguration.uniform(23, 6)
+
     def __init__(self, registration, variant):
         """Initializes an Airbus instance.
         
@@ -128,7 +160,7 @@ class Airbus(Aircraft):
             raise ValueError("Variant must be a string.")
         
         self.__variant = variant
-        super().__init__(registration, "Airbus A319", 23, 6)
+        super().__init__(registration, "Airbus A319", cabin=self.CABIN)
 
     def get_variant(self):
         """Gets the variant of the Airbus.
@@ -139,6 +171,8 @@ class Airbus(Aircraft):
         return self.__variant
 
 class Boeing(Aircraft):
+    CABIN = CabinConfiguration.uniform(56, 9)
+
     def __init__(self, registration, airline):
         """Initializes a Boeing instance.
         
@@ -150,7 +184,7 @@ class Boeing(Aircraft):
             raise ValueError("Airline must be a string.")
         
         self.__airline = airline
-        super().__init__(registration, "Boeing 777", 56, 9)
+        super().__init__(registration, "Boeing 777", cabin=self.CABIN)
     
     def get_airline(self):
         """Gets the airline operating the Boeing.
@@ -0,0 +1,385 @@
+"""
+Author: Manuel Borregales
+
+This module defines the cabin configuration of an aircraft and its compiled form.
+
+Classes:
+    CabinConfiguration: Describes the zones, blocked seats, exit rows and skipped rows of a cabin.
+    CompiledCabin: A dense index of the seats of a cabin, built once per configuration.
+"""
+
+import functools
+import string
+
+class CabinConfiguration:
+    def __init__(self, zones, blocked_seats=(), exit_rows=(), skipped_rows=()):
+        """Initializes a CabinConfiguration instance.
+
+        Each zone is a (name, first_row, last_row, letters) tuple. The letters
+        are given from left to right, with a space for each aisle, e.g.
+        'ABC DEF'. Zones cannot share rows.
+
+        Args:
+            zones (iterable): The zones of the cabin, e.g. [('business', 1, 5, 'AC DF')].
+            blocked_seats (iterable): Seat designators that cannot be allocated, e.g. ['7A'].
+            exit_rows (iterable): The row numbers of the exit rows.
+            skipped_rows (iterable): Row numbers that do not exist on the aircraft, e.g. [13].
+        """
+        zones = tuple(tuple(zone) for zone in zones)
+        blocked_seats, exit_rows, skipped_rows = tuple(blocked_seats), tuple(exit_rows), tuple(skipped_rows)
+        try:
+            self.__verify_zones(zones)
+            self.__verify_layout(blocked_seats, exit_rows, skipped_rows)
+        except ValueError as e:
+            print(e)
+            raise
+
+        self.__zones = tuple(sorted(zones, key=lambda zone: zone[1]))
+        self.__skipped_rows = tuple(sorted(set(skipped_rows)))
+        self.__exit_rows = tuple(sorted(set(exit_rows)))
+        self.__blocked_seats = tuple(sorted(set(blocked_seats)))
+
+        rows = {row for _, first_row, last_row, _ in self.__zones for row in range(first_row, last_row + 1)}
+        rows.difference_update(self.__skipped_rows)
+        if not rows:
+            raise ValueError("A cabin must have at least one row that is not skipped.")
+        for row in self.__exit_rows:
+            if row not in rows:
+                raise ValueError(f"Exit row {row} is not a row of the cabin.")
+        letters_by_row = {row: letters for _, first_row, last_row, letters in self.__zones
+                          for row in range(first_row, last_row + 1)}
+        for seat in self.__blocked_seats:
+            row_str, letter = seat[:-1], seat[-1:]
+            if not row_str.isdigit() or int(row_str) not in rows or letter == " " or letter not in letters_by_row[int(row_str)]:
+                raise ValueError(f"Blocked seat {seat} is not a seat of the cabin.")
+
+    @classmethod
+    def uniform(cls, num_rows, num_seats_per_row):
+        """Creates the configuration of a single zone of identical rows.
+
+        Args:
+            num_rows (int): The number of rows.
+            num_seats_per_row (int): The number of seats per row, lettered from 'A'.
+
+        Returns:
+            CabinConfiguration: The configuration.
+        """
+        if num_seats_per_row > len(string.ascii_uppercase):
+            raise ValueError(f"Number of seats per row cannot be greater than {len(string.ascii_uppercase)}.")
+        return cls([("cabin", 1, num_rows, string.ascii_uppercase[:num_seats_per_row])])
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a configuration from the dict returned by `to_dict`.
+
+        Args:
+            data (dict): The configuration description.
+
+        Returns:
+            CabinConfiguration: The configuration.
+        """
+        try:
+            zones = [(zone["name"], zone["first_row"], zone["last_row"], zone["letters"]) for zone in data["zones"]]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid cabin zones: {e}.") from None
+        return cls(zones, data.get("blocked_seats", ()), data.get("exit_rows", ()), data.get("skipped_rows", ()))
+
+    def to_dict(self):
+        """Gets a JSON-compatible description of the configuration.
+
+        Returns:
+            dict: The configuration description.
+        """
+        return {
+            "zones": [{"name": name, "first_row": first_row, "last_row": last_row, "letters": letters}
+                      for name, first_row, last_row, letters in self.__zones],
+            "blocked_seats": list(self.__blocked_seats),
+            "exit_rows": list(self.__exit_rows),
+            "skipped_rows": list(self.__skipped_rows),
+        }
+
+    def get_zones(self):
+        """Gets the zones of the cabin, front to back.
+
+        Returns:
+            tuple: (name, first_row, last_row, letters) tuples.
+        """
+        return self.__zones
+
+    def compile(self):
+        """Compiles the configuration into a dense seat index.
+
+        Equal configurations share the same compiled cabin, so every
+        aircraft of a type pays for the compilation only once.
+
+        Returns:
+            CompiledCabin: The compiled cabin.
+        """
+        return _compile(self.__key())
+
+    def __key(self):
+        return (self.__zones, self.__blocked_seats, self.__exit_rows, self.__skipped_rows)
+
+    def __eq__(self, other):
+        if not isinstance(other, CabinConfiguration):
+            return NotImplemented
+        return self.__key() == other.__key()
+
+    def __hash__(self):
+        return hash(self.__key())
+
+    def __verify_zones(self, zones):
+        """Verifies that the zones are valid. Raises an error if there are
+        no zones, if a name is not a unique non-empty string, if the rows are
+        not positive integers in order, if the letters are not unique
+        uppercase letters or if two zones share a row.
+
+        Args:
+            zones (tuple): The zones of the cabin.
+
+        Raises:
+            ValueError: If any of the zones is invalid.
+        """
+        if not zones:
+            raise ValueError("A cabin must have at least one zone.")
+
+        names = set()
+        taken_rows = set()
+        for zone in zones:
+            if len(zone) != 4:
+                raise ValueError("Zones must be (name, first_row, last_row, letters) tuples.")
+            name, first_row, last_row, letters = zone
+            if not isinstance(name, str) or not name:
+                raise ValueError("Zone names must be non-empty strings.")
+            if name in names:
+                raise ValueError(f"Zone {name} is defined more than once.")
+            names.add(name)
+            if not isinstance(first_row, int) or not isinstance(last_row, int):
+                raise ValueError(f"Rows of zone {name} must be integers.")
+            if first_row <= 0 or last_row < first_row:
+                raise ValueError(f"Rows of zone {name} must be positive and in order.")
+            if not isinstance(letters, str):
+                raise ValueError(f"Letters of zone {name} must be a string.")
+            seat_letters = letters.replace(" ", "")
+            if not seat_letters or not all(letter in string.ascii_uppercase for letter in seat_letters):
+                raise ValueError(f"Letters of zone {name} must be uppercase letters.")
+            if len(set(seat_letters)) != len(seat_letters):
+                raise ValueError(f"Letters of zone {name} must be unique.")
+            rows = set(range(first_row, last_row + 1))
+            if rows & taken_rows:
+                raise ValueError(f"Zone {name} shares rows with another zone.")
+            taken_rows |= rows
+
+    def __verify_layout(self, blocked_seats, exit_rows, skipped_rows):
+        """Verifies that the blocked seats are strings and that the exit rows
+        and skipped rows are integers. Whether they belong to the cabin is
+        checked once the rows are known.
+
+        Args:
+            blocked_seats (tuple): The blocked seat designators.
+            exit_rows (tuple): The row numbers of the exit rows.
+            skipped_rows (tuple): The row numbers that do not exist.
+
+        Raises:
+            ValueError: If any of them has the wrong type.
+        """
+        for seat in blocked_seats:
+            if not isinstance(seat, str):
+                raise ValueError(f"Blocked seat {seat!r} must be a string such as '7A'.")
+        for row in exit_rows:
+            if not isinstance(row, int):
+                raise ValueError(f"Exit row {row!r} must be an integer.")
+        for row in skipped_rows:
+            if not isinstance(row, int):
+                raise ValueError(f"Skipped row {row!r} must be an integer.")
+
+class CompiledCabin:
+    def __init__(self, zones, blocked_seats, exit_rows, skipped_rows):
+        """Initializes a CompiledCabin instance. Use CabinConfiguration.compile instead.
+
+        Seats are numbered densely, front to back and left to right, so the
+        seats of a zone form a contiguous range of indices.
+
+        Args:
+            zones (tuple): The verified zones, front to back.
+            blocked_seats (tuple): The blocked seat designators.
+            exit_rows (tuple): The exit row numbers.
+            skipped_rows (tuple): The skipped row numbers.
+        """
+        blocked = set(blocked_seats)
+        skipped = set(skipped_rows)
+        num_rows = zones[-1][2]
+
+        designators, seat_rows, seat_letters, seat_zones, adjacency = [], [], [], [], []
+        index = {}
+        zone_ranges = {}
+        row_letters = [None] * (num_rows + 1)  # Index 0 is set to None.
+
+        for name, first_row, last_row, letters in zones:
+            zone_start = len(designators)
+            for row in range(first_row, last_row + 1):
+                if row in skipped:
+                    continue
+                row_index = {}
+                for position, letter in enumerate(letters):
+                    seat = f"{row}{letter}"
+                    if letter == " " or seat in blocked:
+                        continue
+                    row_index[position] = len(designators)
+                    index[seat] = len(designators)
+                    designators.append(seat)
+                    seat_rows.append(row)
+                    seat_letters.append(letter)
+                    seat_zones.append(name)
+                row_letters[row] = "".join(seat_letters[i] for i in row_index.values())
+                # Neighbours are the seats right next to each other, not across an aisle or a blocked seat.
+                for position, i in row_index.items():
+                    adjacency.append(tuple(row_index[p] for p in (position - 1, position + 1) if p in row_index))
+            zone_ranges[name] = range(zone_start, len(designators))
+
+        self.__designators = tuple(designators)
+        self.__index = index
+        self.__seat_rows = tuple(seat_rows)
+        self.__seat_letters = tuple(seat_letters)
+        self.__seat_zones = tuple(seat_zones)
+        self.__adjacency = tuple(adjacency)
+        self.__zone_ranges = zone_ranges
+        self.__row_letters = tuple(row_letters)
+        self.__exit_rows = frozenset(exit_rows)
+        self.__blocked_seats = frozenset(blocked_seats)
+        self.__max_seats_per_row = max(len(letters) for letters in row_letters if letters is not None)
+
+    def num_seats(self):
+        """Gets the number of seats that can be allocated.
+
+        Returns:
+            int: The number of seats.
+        """
+        return len(self.__designators)
+
+    def get_num_rows(self):
+        """Gets the number of the last row.
+
+        Returns:
+            int: The number of the last row.
+        """
+        return len(self.__row_letters) - 1
+
+    def get_max_seats_per_row(self):
+        """Gets the number of seats of the widest row.
+
+        Returns:
+            int: The number of seats of the widest row.
+        """
+        return self.__max_seats_per_row
+
+    def get_row_letters(self):
+        """Gets the letters of the seats of each row.
+
+        Returns:
+            tuple: Index 0 and skipped rows are None, the others are strings such as 'ABCDEF'.
+        """
+        return self.__row_letters
+
+    def get_seat_index(self, seat):
+        """Gets the index of a seat designator.
+
+        Args:
+            seat (str): A seat designator such as '12C'.
+
+        Returns:
+            int: The index of the seat, or None if the seat does not exist or is blocked.
+        """
+        return self.__index.get(seat)
+
+    def get_designator(self, index):
+        """Gets the seat designator of an index.
+
+        Args:
+            index (int): The index of the seat.
+
+        Returns:
+            str: The seat designator.
+        """
+        return self.__designators[index]
+
+    def get_seat(self, index):
+        """Gets the row and letter of an index.
+
+        Args:
+            index (int): The index of the seat.
+
+        Returns:
+            tuple: The row number (int) and the seat letter (str).
+        """
+        return self.__seat_rows[index], self.__seat_letters[index]
+
+    def get_zone(self, index):
+        """Gets the zone of an index.
+
+        Args:
+            index (int): The index of the seat.
+
+        Returns:
+            str: The name of the zone.
+        """
+        return self.__seat_zones[index]
+
+    def get_zone_names(self):
+        """Gets the names of the zones, front to back.
+
+        Returns:
+            tuple: The zone names.
+        """
+        return tuple(self.__zone_ranges)
+
+    def get_zone_range(self, zone):
+        """Gets the indices of the seats of a zone.
+
+        Args:
+            zone (str): The name of the zone.
+
+        Returns:
+            range: The indices of the seats of the zone.
+        """
+        if zone not in self.__zone_ranges:
+            raise ValueError(f"Invalid zone {zone}. The zone must be one of {', '.join(self.__zone_ranges)}.")
+        return self.__zone_ranges[zone]
+
+    def get_adjacent(self, index):
+        """Gets the indices of the seats right next to a seat.
+
+        Args:
+            index (int): The index of the seat.
+
+        Returns:
+            tuple: The indices of the neighbouring seats in the same row.
+        """
+        return self.__adjacency[index]
+
+    def is_blocked(self, seat):
+        """Checks whether a seat designator is a blocked seat.
+
+        Args:
+            seat (str): A seat designator such as '12C'.
+
+        Returns:
+            bool: True if the seat is blocked; False otherwise.
+        """
+        return seat in self.__blocked_seats
+
+    def is_exit_row(self, row):
+        """Checks whether a row is an exit row.
+
+        Args:
+            row (int): The row number.
+
+        Returns:
+            bool: True if the row is an exit row; False otherwise.
+        """
+        return row in self.__exit_rows
+
+@functools.lru_cache(maxsize=None)
+def _compile(key):
+    """Compiles a configuration key, once per distinct configuration."""
+    return CompiledCabin(*key)
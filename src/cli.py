@@ -0,0 +1,193 @@
+"""
+Author: Manuel Borregales
+
+This module defines the command-line entry point, run with `python -m src`.
+
+The flight modules are only imported by the commands that need them, and
+manifests are processed one flight at a time, writing the output as it is
+produced.
+
+Functions:
+    main: Parses the arguments and runs a command.
+"""
+
+import argparse
+import contextlib
+import sys
+
+def main(argv=None, stdout=None):
+    """Parses the arguments and runs a command.
+
+    Args:
+        argv (list): The arguments, without the program name. Defaults to sys.argv.
+        stdout (file): Where the output is written. Defaults to sys.stdout.
+
+    Returns:
+        int: The exit status.
+    """
+    args = _build_parser().parse_args(argv)
+    out = stdout if stdout is not None else sys.stdout
+    try:
+        # The flight modules print their validation messages, which must not
+        # end up in the streamed output.
+        with contextlib.redirect_stdout(sys.stderr):
+            args.handler(args, out)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def _build_parser():
+    """Builds the argument parser with one subparser per command.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src", description="Flight reservation batch commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, handler, summary):
+        subparser = subparsers.add_parser(name, help=summary)
+        subparser.add_argument("manifests", nargs="+", metavar="MANIFEST",
+                               help="JSONL manifest with one flight per line, or - for standard input")
+        subparser.add_argument("--flight", action="append", dest="flights", metavar="NUMBER",
+                               help="only process this flight (can be repeated)")
+        subparser.set_defaults(handler=handler)
+        return subparser
+
+    add_command("load", _load, "validate manifests, summarise them and report double bookings")
+    add_command("availability", _availability, "report the available seats of each flight")
+    add_command("boarding-cards", _boarding_cards, "render the boarding cards of each flight")
+    seatmap = add_command("seatmap", _seatmap, "export the seat map of each flight")
+    seatmap.add_argument("--format", choices=("csv", "text"), default="csv")
+    allocate = add_command("allocate", _allocate, "allocate seats and write the updated manifest")
+    allocate.epilog = ("The manifest is written as the flights are processed, so when a booking fails or a flight is "
+                       "missing the output is incomplete and the exit status is 1. Write it to a new file and only "
+                       "replace the manifest on success.")
+    allocate.add_argument("--book", action="append", nargs=5, required=True, dest="bookings",
+                          metavar=("FLIGHT", "SEAT", "NAME", "SURNAME", "ID_CARD"),
+                          help="allocate a seat to a passenger (can be repeated)")
+    return parser
+
+def _records(args):
+    """Yields the selected flight records of every manifest, one at a time.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+
+    Yields:
+        dict: The record of each selected flight.
+    """
+    from src.manifest import read_manifest
+
+    selected = set(args.flights) if args.flights else None
+    for path in args.manifests:
+        if path == "-":
+            records = read_manifest(sys.stdin)
+        else:
+            records = _read_file(path, read_manifest)
+        for record in records:
+            if selected is None or record.get("number") in selected:
+                yield record
+
+def _read_file(path, read_manifest):
+    """Yields the records of a manifest file, closing it when done.
+
+    Args:
+        path (str): The path of the manifest.
+        read_manifest (callable): The manifest reader.
+
+    Yields:
+        dict: The record of each flight.
+    """
+    with open(path) as lines:
+        yield from read_manifest(lines)
+
+def _flights(args):
+    """Yields the selected flights of every manifest, one at a time.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+
+    Yields:
+        Flight: Each selected flight.
+    """
+    from src.manifest import load_flight
+
+    for record in _records(args):
+        yield load_flight(record)
+
+def _load(args, out):
+    """Validates every flight of the manifests and writes a summary and the double bookings."""
+    from src.manifest import load_flight
+    from src.passenger_index import PassengerIndex
+
+    index = PassengerIndex()
+    num_flights = num_bookings = 0
+    for record in _records(args):
+        load_flight(record, passenger_index=index)
+        num_flights += 1
+        num_bookings += len(record.get("passengers", ()))
+    out.write(f"Loaded {num_flights} flights with {num_bookings} bookings of {index.num_passengers()} passengers\n")
+
+    for id_card, bookings in sorted(index.find_double_bookings().items()):
+        seats = ", ".join(f"{number} {seat}" for number, seat in bookings)
+        out.write(f"Passenger {id_card} is booked on several flights: {seats}\n")
+
+def _availability(args, out):
+    """Writes the number, aircraft model and available seats of each flight."""
+    for flight in _flights(args):
+        out.write(f"{flight.get_number()}\t{flight.get_aircraft_model()}\t{flight.num_available_seats()}\n")
+
+def _boarding_cards(args, out):
+    """Writes the boarding cards of each flight."""
+    for flight in _flights(args):
+        for line in flight.boarding_card_lines():
+            out.write(line + "\n")
+
+def _seatmap(args, out):
+    """Writes the seat map of each flight, as CSV with one seat per line or as text."""
+    import csv
+
+    if args.format == "text":
+        for flight in _flights(args):
+            out.write(f"Flight {flight.get_number()}\n")
+            for line in flight.seating_lines():
+                out.write(line + "\n")
+        return
+
+    writer = csv.writer(out)
+    writer.writerow(("flight", "seat", "name", "surname", "id_card"))
+    for flight in _flights(args):
+        number = flight.get_number()
+        for row_number, row in enumerate(flight.get_seating()):
+            if row is None:
+                continue
+            for letter, passenger in row.items():
+                writer.writerow((number, f"{row_number}{letter}", *(passenger or ("", "", ""))))
+
+def _allocate(args, out):
+    """Allocates the requested seats, refusing double bookings, and writes the updated manifest.
+
+    The output stops at the first error, so it is only complete when no error is raised.
+    """
+    import json
+
+    from src.manifest import dump_flight, load_flight
+    from src.passenger import Passenger
+    from src.passenger_index import PassengerIndex
+
+    bookings = {}
+    for number, seat, name, surname, id_card in args.bookings:
+        bookings.setdefault(number, []).append((seat, Passenger(name, surname, id_card).passenger_data()))
+
+    # Passengers already holding a seat on a flight cannot be booked on it again.
+    index = PassengerIndex()
+    for record in _records(args):
+        flight = load_flight(record, passenger_index=index)
+        for seat, passenger in bookings.pop(flight.get_number(), ()):
+            flight.allocate_passenger(seat, passenger)
+        out.write(json.dumps(dump_flight(flight, record["aircraft"])) + "\n")
+
+    if bookings:
+        raise ValueError(f"Flights not found in the manifests: {', '.join(sorted(bookings))}.")
@@ -0,0 +1,144 @@
+"""
+Author: Manuel Borregales
+
+This module defines the SeatEventFeed class for publishing seat changes.
+
+Classes:
+    SeatEventFeed: A bounded, subscribable feed of seat change events.
+"""
+
+import sys
+from collections import deque
+from itertools import islice
+
+class SeatEventFeed:
+    def __init__(self, capacity=1024):
+        """Initializes a SeatEventFeed instance.
+
+        Events are kept in a ring buffer, so only the most recent `capacity`
+        events can be replayed. Each event is a tuple of
+        (sequence, action, from_seat, to_seat, passenger), where action is
+        'allocate', 'reallocate' or 'deallocate' and the unused seat is None.
+
+        Args:
+            capacity (int): The maximum number of events kept in the buffer.
+        """
+        if not isinstance(capacity, int):
+            raise ValueError("Capacity must be an integer.")
+        if capacity <= 0:
+            raise ValueError("Capacity must be a positive integer.")
+
+        self.__events = deque(maxlen=capacity)
+        self.__last_sequence = 0
+        self.__subscribers = []
+        self.__undelivered = deque()
+        self.__delivering = False
+
+    def get_capacity(self):
+        """Gets the maximum number of events kept in the buffer.
+
+        Returns:
+            int: The capacity of the buffer.
+        """
+        return self.__events.maxlen
+
+    def get_last_sequence(self):
+        """Gets the sequence number of the most recent event.
+
+        Returns:
+            int: The last sequence number, or 0 if nothing was published yet.
+        """
+        return self.__last_sequence
+
+    def publish(self, action, from_seat, to_seat, passenger):
+        """Appends an event to the buffer and notifies the subscribers.
+
+        Events published by a subscriber while it is being notified are
+        delivered after the current one, so every subscriber receives the
+        events in sequence order.
+
+        The seat change has already happened when its event is published, so
+        an exception raised by a subscriber is reported on stderr instead of
+        being raised to the caller, and the event is still delivered to the
+        other subscribers.
+
+        Args:
+            action (str): 'allocate', 'reallocate' or 'deallocate'.
+            from_seat (str): The seat that was freed, or None.
+            to_seat (str): The seat that was taken, or None.
+            passenger (tuple): The passenger data affected by the change.
+
+        Returns:
+            tuple: The published event.
+        """
+        self.__last_sequence += 1
+        event = (self.__last_sequence, action, from_seat, to_seat, passenger)
+        self.__events.append(event)
+        self.__undelivered.append(event)
+        if self.__delivering:
+            # Published from inside a callback: the outer call delivers it once
+            # every subscriber has seen the earlier events.
+            return event
+
+        self.__delivering = True
+        try:
+            while self.__undelivered:
+                pending = self.__undelivered.popleft()
+                # Iterate over a copy so callbacks can unsubscribe themselves.
+                for callback in list(self.__subscribers):
+                    try:
+                        callback(pending)
+                    except Exception as e:
+                        print(f"Subscriber {callback!r} failed on event {pending[0]}: {e!r}", file=sys.stderr)
+        finally:
+            # Events left undelivered by an interruption go out with the next publish.
+            self.__delivering = False
+        return event
+
+    def events_since(self, sequence):
+        """Gets the events published after the given sequence number.
+
+        Args:
+            sequence (int): The last sequence number the consumer has seen.
+
+        Returns:
+            list: The events with a sequence number greater than `sequence`.
+
+        Raises:
+            ValueError: If some of the requested events were already dropped
+                from the buffer and the consumer has to rescan the seating.
+        """
+        if not isinstance(sequence, int) or sequence < 0:
+            raise ValueError("Sequence must be a non-negative integer.")
+        if sequence >= self.__last_sequence:
+            return []
+
+        first_sequence = self.__last_sequence - len(self.__events) + 1
+        if sequence + 1 < first_sequence:
+            raise ValueError(f"Events after sequence {sequence} are no longer available. The oldest available sequence is {first_sequence}.")
+        return list(islice(self.__events, sequence + 1 - first_sequence, None))
+
+    def subscribe(self, callback, since=None):
+        """Registers a callback that receives every new event.
+
+        Args:
+            callback (callable): Called with each event tuple.
+            since (int): If given, the events after this sequence number are
+                replayed to the callback before it receives new ones.
+        """
+        if not callable(callback):
+            raise ValueError("Callback must be callable.")
+        if since is not None:
+            for event in self.events_since(since):
+                callback(event)
+        self.__subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a previously registered callback.
+
+        Args:
+            callback (callable): The callback to remove.
+        """
+        if callback not in self.__subscribers:
+            raise ValueError("Callback is not subscribed.")
+        self.__subscribers.remove(callback)
@@ -7,15 +7,21 @@ Classes:
     Flight: Represents a flight, including seating arrangements and boarding passes.
 """
 
+import hashlib
+
 from src.aircraft import Aircraft
+from src.events import SeatEventFeed
 
 class Flight:
-    def __init__(self, number, aircraft):
+    def __init__(self, number, aircraft, event_capacity=1024, passenger_index=None):
         """Initializes a Flight instance with the given flight number and aircraft.
         
         Args:
             number (str): The flight number.
             aircraft (Aircraft): An instance of an Aircraft.
+            event_capacity (int): The number of seat change events kept for replay.
+            passenger_index (PassengerIndex): A fleet-wide index that is checked before
+                seating a passenger and updated on every seat change.
         """
         try:
             self.__verify_flight_number(number)
@@ -28,15 +34,26 @@ class Flight:
         self.__aircraft = Aircraft(
             aircraft.get_registration(),
             aircraft.get_model(),
-            aircraft.get_num_rows(),
-            aircraft.get_num_seats_per_row()
+            cabin=aircraft.get_cabin()
         )
+        self.__cabin = self.__aircraft.get_compiled_cabin()
         
-        rows, seats = self.__aircraft.seating_plan()
-        # Row 0 is intentionally left as None so that the row number matches its index.
-        for row_number in range(1, len(rows)):
-            rows[row_number] = {letter: None for letter in seats}
+        # Row 0 and skipped rows are intentionally left as None so that the row number matches its index.
+        rows = [None if letters is None else {letter: None for letter in letters}
+                for letters in self.__cabin.get_row_letters()]
         self.__seating = rows
+        # Occupancy by seat index, kept alongside the seating so that counts and
+        # searches do not have to walk every row.
+        self.__occupied = bytearray(self.__cabin.num_seats())
+        self.__available = self.__cabin.num_seats()
+        self.__available_by_zone = {zone: len(self.__cabin.get_zone_range(zone))
+                                    for zone in self.__cabin.get_zone_names()}
+        # Each fingerprint is the XOR of the hashes of the occupied seats, so it
+        # can be updated in constant time on every change.
+        self.__row_fingerprints = [0] * len(rows)
+        self.__fingerprint = 0
+        self.__events = SeatEventFeed(event_capacity)
+        self.__passenger_index = passenger_index
     
     def get_number(self):
         """Gets the flight number.
@@ -53,6 +70,14 @@ class Flight:
             str: The aircraft model.
         """
         return self.__aircraft.get_model()
+
+    def get_cabin(self):
+        """Gets the compiled cabin of the aircraft used in the flight.
+        
+        Returns:
+            CompiledCabin: The seat index, zones and adjacency table of the cabin.
+        """
+        return self.__cabin
     
     def get_seating(self):
         """Gets the seating plan of the flight.
@@ -61,6 +86,41 @@ class Flight:
             list: The seating plan represented as a list where index 0 is None and each subsequent element is a dict mapping seat letters to passenger data.
         """
         return self.__seating
+
+    def get_row_fingerprints(self):
+        """Gets a fingerprint of the occupants of each row.
+        
+        Rows with the same fingerprint on two flights have, barring hash
+        collisions, the same passengers in the same seats.
+        
+        Returns:
+            tuple: One integer per row, index 0 included so that the row number matches its index.
+        """
+        return tuple(self.__row_fingerprints)
+
+    def get_fingerprint(self):
+        """Gets a fingerprint of the occupants of the whole flight.
+        
+        Returns:
+            int: The combined fingerprint of every row.
+        """
+        return self.__fingerprint
+
+    def get_event_feed(self):
+        """Gets the feed of seat change events of the flight.
+        
+        Returns:
+            SeatEventFeed: The feed that receives an event for every allocation, reallocation and deallocation.
+        """
+        return self.__events
+
+    def get_passenger_index(self):
+        """Gets the fleet-wide passenger index the flight keeps up to date.
+        
+        Returns:
+            PassengerIndex: The index, or None if the flight has none.
+        """
+        return self.__passenger_index
     
     def allocate_passenger(self, seat, passenger):
         """Allocates a seat to a passenger.
@@ -70,15 +130,21 @@ class Flight:
             passenger (tuple): The passenger data (e.g., ('Jack', 'Shephard', '85994003S')).
         """
 
-        if self.num_available_seats() == 0:
+        if self.__available == 0:
             raise ValueError("No available seats")
 
-        row, letter = self.__parse_seat(seat)
+        index = self.__parse_seat(seat)
 
-        if self.__seating[row][letter] is not None:
+        if self.__occupied[index]:
             raise ValueError(f"Seat {seat} is already occupied")
 
-        self.__seating[row][letter] = passenger
+        designator = self.__cabin.get_designator(index)
+        if self.__passenger_index is not None:
+            # Checks and records the booking at once, before the seat changes.
+            self.__passenger_index.record_allocation(passenger[2], self.__number, designator)
+
+        self.__occupy(index, passenger)
+        self.__events.publish("allocate", None, designator, passenger)
         
     def reallocate_passenger(self, from_seat, to_seat):
         """Reallocates a passenger from one seat to another.
@@ -87,34 +153,113 @@ class Flight:
             from_seat (str): The current seat designator for the passenger (e.g., '12C').
             to_seat (str): The new seat designator.
         """
-        from_row, from_letter = self.__parse_seat(from_seat)
-        to_row, to_letter = self.__parse_seat(to_seat)
+        from_index = self.__parse_seat(from_seat)
+        to_index = self.__parse_seat(to_seat)
         
-        if self.__seating[from_row][from_letter] is None:
+        if not self.__occupied[from_index]:
             raise ValueError(f"Initial seat {from_seat} is not occupied")
         
-        if self.__seating[to_row][to_letter] is not None:
+        if self.__occupied[to_index]:
             raise ValueError(f"Wanted seat {to_seat} is already occupied")
         
+        from_designator = self.__cabin.get_designator(from_index)
+        to_designator = self.__cabin.get_designator(to_index)
+        if self.__passenger_index is not None:
+            # Update the index before the seats change, so a failure leaves both as they were.
+            passenger = self.get_passenger(from_designator)
+            self.__passenger_index.record_reallocation(passenger[2], self.__number, from_designator, to_designator)
+
         # Get the passenger, reallocate it, and remove it from the original seat.
-        passenger = self.__seating[from_row][from_letter]
-        self.__seating[to_row][to_letter] = passenger
-        self.__seating[from_row][from_letter] = None
+        passenger = self.__vacate(from_index)
+        self.__occupy(to_index, passenger)
+        self.__events.publish("reallocate", from_designator, to_designator, passenger)
+
+    def deallocate_passenger(self, seat):
+        """Frees a seat, removing the passenger that occupied it.
+        
+        Args:
+            seat (str): The seat designator to free (e.g., '12C').
+        
+        Returns:
+            tuple: The passenger data that occupied the seat.
+        """
+        index = self.__parse_seat(seat)
+
+        if not self.__occupied[index]:
+            raise ValueError(f"Seat {seat} is not occupied")
+
+        designator = self.__cabin.get_designator(index)
+        if self.__passenger_index is not None:
+            # Update the index before the seat changes, so a failure leaves both as they were.
+            self.__passenger_index.record_deallocation(self.get_passenger(designator)[2], self.__number, designator)
+
+        passenger = self.__vacate(index)
+        self.__events.publish("deallocate", designator, None, passenger)
+        return passenger
+
+    def is_seat_available(self, seat):
+        """Checks whether a seat is unoccupied.
+        
+        Args:
+            seat (str): A seat designator such as '12C'.
+        
+        Returns:
+            bool: True if the seat is unoccupied; False otherwise.
+        """
+        return not self.__occupied[self.__parse_seat(seat)]
+
+    def get_passenger(self, seat):
+        """Gets the passenger sitting in a seat.
+        
+        Args:
+            seat (str): A seat designator such as '12C'.
+        
+        Returns:
+            tuple: The passenger data, or None if the seat is unoccupied.
+        """
+        row, letter = self.__cabin.get_seat(self.__parse_seat(seat))
+        return self.__seating[row][letter]
 
-    def num_available_seats(self):
-        """Calculates the number of available (unoccupied) seats.
+    def num_available_seats(self, zone=None):
+        """Gets the number of available (unoccupied) seats.
+        
+        Args:
+            zone (str): If given, only the seats of this zone are counted.
         
         Returns:
             int: The number of unoccupied seats.
         """
-        available_seats = 0
-        for row in self.__seating:
-            if row is None:  # Skip rows that are None (like row 0).
-                continue
-            for letter in row:  # Iterate over the seat letters in the row.
-                if row[letter] is None:
-                    available_seats += 1
-        return available_seats
+        if zone is None:
+            return self.__available
+        self.__cabin.get_zone_range(zone)  # Raises if the zone does not exist.
+        return self.__available_by_zone[zone]
+
+    def find_available_seats(self, zone=None):
+        """Generator that yields the available seats, front to back.
+        
+        Args:
+            zone (str): If given, only the seats of this zone are searched.
+        
+        Yields:
+            str: The designator of each unoccupied seat.
+        """
+        seats = range(len(self.__occupied)) if zone is None else self.__cabin.get_zone_range(zone)
+        index = self.__occupied.find(0, seats.start, seats.stop)
+        while index != -1:
+            yield self.__cabin.get_designator(index)
+            index = self.__occupied.find(0, index + 1, seats.stop)
+
+    def adjacent_seats(self, seat):
+        """Gets the seats right next to a seat, not across an aisle.
+        
+        Args:
+            seat (str): A seat designator such as '12C'.
+        
+        Returns:
+            list: The designators of the neighbouring seats in the same row.
+        """
+        index = self.__parse_seat(seat)
+        return [self.__cabin.get_designator(neighbour) for neighbour in self.__cabin.get_adjacent(index)]
 
     def print_seating(self):
         """Prints the seating plan to the console.
@@ -122,47 +267,110 @@ class Flight:
         Example:
             Row 1 {'A': None, 'B': None, 'C': None, 'D': None, 'E': None, 'F': None}
         """
-        i = 0
-        for row in self.__seating:
-            print(f"Row {i} {row}")
-            i += 1
+        for line in self.seating_lines():
+            print(line)
 
     def print_boarding_cards(self):
         """Prints the boarding cards for each passenger to the console.
         
         Each boarding card includes the passenger's name, surname, ID, seat, flight number, and aircraft model.
         """
+        for line in self.boarding_card_lines():
+            print(line)
+
+    def seating_lines(self):
+        """Generator that yields the lines printed by print_seating, one row at a time.
+        
+        Yields:
+            str: The line of each row, row 0 included.
+        """
+        for row_number, row in enumerate(self.__seating):
+            yield f"Row {row_number} {row}"
+
+    def boarding_card_lines(self):
+        """Generator that yields the lines printed by print_boarding_cards, one passenger at a time.
+        
+        Yields:
+            str: The lines of each boarding card.
+        """
+        flight_number = self.__number
+        aircraft_model = self.__aircraft.get_model()
         for passenger, seat in self.__passenger_seats():
             name, surname, id_card = passenger
-            flight_number = self.__number
-            aircraft_model = self.__aircraft.get_model()
-            print("----------------------------------------------------------")
-            print(f"|     {name} {surname} {id_card} {seat} {flight_number} {aircraft_model}      |")
-            print("----------------------------------------------------------")
-
+            yield "----------------------------------------------------------"
+            yield f"|     {name} {surname} {id_card} {seat} {flight_number} {aircraft_model}      |"
+            yield "----------------------------------------------------------"
 
     def __parse_seat(self, seat):
-        """Parses a seat designator into a row number and a seat letter.
+        """Parses a seat designator into the index of the seat in the compiled cabin.
         
         Args:
             seat (str): The seat designator (e.g., '12C').
         
         Returns:
-            tuple: A tuple containing the row number (int) and the seat letter (str).
+            int: The index of the seat.
         """
+        index = self.__cabin.get_seat_index(seat)
+        if index is not None:
+            return index
+
         letter = seat[-1]
         row_str = seat[:-1]  # Keep it as string for validation
         try:
-            # Validate before converting to int
+            # Find out why the designator is not in the index, or accept forms such as '01A'.
             self.__verify_seat(row_str, letter)
         except ValueError as e:
             print(e)
             # If you want to propagate the error, use:
             raise
 
-        # Now convert row_str to int after verification
-        row = int(row_str)
-        return row, letter
+        return self.__cabin.get_seat_index(f"{int(row_str)}{letter}")
+
+    def __occupy(self, index, passenger):
+        """Places a passenger in a free seat and updates the counts and fingerprints.
+        
+        Args:
+            index (int): The index of the seat.
+            passenger (tuple): The passenger data.
+        """
+        row, letter = self.__cabin.get_seat(index)
+        self.__seating[row][letter] = passenger
+        self.__occupied[index] = 1
+        self.__available -= 1
+        self.__available_by_zone[self.__cabin.get_zone(index)] -= 1
+        self.__toggle_fingerprint(row, letter, passenger)
+
+    def __vacate(self, index):
+        """Removes the passenger of an occupied seat and updates the counts and fingerprints.
+        
+        Args:
+            index (int): The index of the seat.
+        
+        Returns:
+            tuple: The passenger data that occupied the seat.
+        """
+        row, letter = self.__cabin.get_seat(index)
+        passenger = self.__seating[row][letter]
+        self.__seating[row][letter] = None
+        self.__occupied[index] = 0
+        self.__available += 1
+        self.__available_by_zone[self.__cabin.get_zone(index)] += 1
+        self.__toggle_fingerprint(row, letter, passenger)
+        return passenger
+
+    def __toggle_fingerprint(self, row, letter, passenger):
+        """Adds an occupied seat to the fingerprints, or removes it if it was already added.
+        
+        Args:
+            row (int): The row number.
+            letter (str): The seat letter.
+            passenger (tuple): The passenger data of the seat.
+        """
+        # A stable hash, unlike hash(), so fingerprints can be compared across processes.
+        key = "\x1f".join([f"{row}{letter}", *map(str, passenger)]).encode()
+        seat_hash = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+        self.__row_fingerprints[row] ^= seat_hash
+        self.__fingerprint ^= seat_hash
 
     def __passenger_seats(self):
         """Generator that yields tuples of passenger data and their seat designator.
@@ -200,13 +408,14 @@ class Flight:
         return True
     
     def __verify_seat(self, row_str, letter):
-        """Verifies that the seat is valid. Returns false if the row is 
-        less than 1 or greater than the number of rows, if the seat letter 
-        is not alphabetical, if the seat letter is greater than the number
-        of seats per row and if the row characters are numbers.
+        """Verifies that the seat is valid. Only called for designators that
+        are not in the compiled cabin, to explain why. Raises an error if the
+        row characters aren't numbers, if the seat letter is not alphabetical,
+        if the row is less than 1 or greater than the number of rows, if the
+        row is skipped, if the seat is blocked or if the row has no such letter.
         
         Args:
-            row (int): The row number.
+            row_str (str): The row number.
             letter (str): The seat letter.
         
         Returns:
@@ -218,13 +427,15 @@ class Flight:
             raise ValueError(f"Invalid seat letter {letter}. The seat letter must be alphabetical.")
 
         row = int(row_str)
-        if row < 1 or row > self.__aircraft.get_num_rows():
-            raise ValueError(f"Invalid row number {row}. The row number must be between 1 and {self.__aircraft.get_num_rows()}.")
+        if row < 1 or row > self.__cabin.get_num_rows():
+            raise ValueError(f"Invalid row number {row}. The row number must be between 1 and {self.__cabin.get_num_rows()}.")
         
-        # Convert letter to a numerical index, e.g., 'A' -> 1, 'B' -> 2, etc.
-        seat_index = ord(letter.upper()) - ord('A') + 1
-        if seat_index > self.__aircraft.get_num_seats_per_row():
-            raise ValueError(f"Invalid seat letter {letter}. The seat letter must be between 'A' and {chr(ord('A') + self.__aircraft.get_num_seats_per_row() - 1)}.")
+        row_letters = self.__cabin.get_row_letters()[row]
+        if row_letters is None:
+            raise ValueError(f"Invalid row number {row}. Row {row} does not exist on this aircraft.")
+        if self.__cabin.is_blocked(f"{row}{letter}"):
+            raise ValueError(f"Invalid seat {row}{letter}. The seat is blocked.")
+        if letter not in row_letters:
+            raise ValueError(f"Invalid seat letter {letter}. The seat letter must be one of {row_letters} in row {row}.")
         
         return True
-        
@@ -0,0 +1,265 @@
+"""
+Author: Manuel Borregales
+
+This module defines the ItineraryBooker class for booking connecting flights.
+
+Classes:
+    ItineraryBooker: Books seats on several flights at once, on every leg or on none.
+"""
+
+import contextlib
+import functools
+import itertools
+import threading
+import time
+
+class ItineraryBooker:
+    def __init__(self, hold_ttl=300.0, clock=time.monotonic):
+        """Initializes an ItineraryBooker instance.
+
+        Booking is done in two phases. `hold` allocates the seats of every
+        leg, so nobody else can take them, and `commit` confirms them before
+        the hold expires. Expired or released holds free their seats again.
+        Holds expire lazily, on every call to `hold`, `commit`, `release`,
+        `cancel` or `expire_holds`, so an idle booker should call
+        `expire_holds` periodically to free expired seats promptly. A held
+        passenger moved to another seat with `reallocate_passenger` is
+        followed, so the new seat is the one freed.
+
+        Flights are locked in the order of their flight numbers, so concurrent
+        itineraries touching the same flights cannot deadlock. Flight numbers
+        are expected to be unique among the flights given to one booker. The
+        locks belong to the booker: seat changes made directly on the flights,
+        by waitlists or by another booker do not take them, so they must not
+        run concurrently with the booker on the same flights. Use one booker
+        per fleet.
+
+        Args:
+            hold_ttl (float): The default number of seconds a hold is kept.
+            clock (callable): Returns the current time in seconds.
+        """
+        if not isinstance(hold_ttl, (int, float)) or hold_ttl <= 0:
+            raise ValueError("Hold time to live must be a positive number.")
+
+        self.__hold_ttl = hold_ttl
+        self.__clock = clock
+        self.__flight_locks = {}
+        self.__flight_locks_lock = threading.Lock()
+        # Maps hold ids to (expires_at, legs, id_card) tuples, and each held
+        # (flight number, seat) to its hold id, to follow reallocations.
+        self.__holds = {}
+        self.__held_seats = {}
+        self.__holds_lock = threading.Lock()
+        self.__hold_ids = itertools.count(1)
+
+    def hold(self, passenger, legs, ttl=None):
+        """Allocates a seat on every leg of an itinerary, or on none of them.
+
+        Args:
+            passenger (tuple): The passenger data (e.g., ('Jack', 'Shephard', '85994003S')).
+            legs (iterable): (flight, seat) tuples, one per leg.
+            ttl (float): The number of seconds the hold is kept. Defaults to the booker's.
+
+        Returns:
+            int: The id of the hold, to be passed to `commit` or `release`.
+        """
+        legs = tuple(legs)
+        if not legs:
+            raise ValueError("An itinerary must have at least one leg.")
+        if ttl is None:
+            ttl = self.__hold_ttl
+        if not isinstance(ttl, (int, float)) or ttl <= 0:
+            raise ValueError("Hold time to live must be a positive number.")
+
+        self.expire_holds()
+
+        with self.__locked(flight for flight, _ in legs):
+            allocated = []
+            try:
+                for flight, seat in legs:
+                    flight.allocate_passenger(seat, passenger)
+                    # Store the designator as the flight publishes it, e.g. '1A' for '01A'.
+                    allocated.append((flight, f"{int(seat[:-1])}{seat[-1]}"))
+            except BaseException:
+                # Roll back the legs that were already allocated, whatever went
+                # wrong, so a failed hold never leaves seats behind.
+                for flight, seat in reversed(allocated):
+                    flight.deallocate_passenger(seat)
+                raise
+
+            # Record the hold before the flights are unlocked, so no
+            # reallocation of its seats can be missed.
+            hold_id = next(self.__hold_ids)
+            legs = tuple(allocated)
+            with self.__holds_lock:
+                self.__holds[hold_id] = (self.__clock() + ttl, legs, passenger[2])
+                for flight, seat in legs:
+                    self.__held_seats[(flight.get_number(), seat)] = hold_id
+        return hold_id
+
+    def commit(self, hold_id):
+        """Confirms the seats of a hold.
+
+        Args:
+            hold_id (int): The id returned by `hold`.
+
+        Returns:
+            list: The (flight number, seat) tuples of the booked legs.
+        """
+        hold = self.__pop_hold(hold_id)
+        if hold is None:
+            raise ValueError(f"Hold {hold_id} does not exist")
+
+        expires_at, legs, id_card = hold
+        if self.__clock() >= expires_at:
+            self.__free(legs, id_card)
+            raise ValueError(f"Hold {hold_id} has expired")
+        self.expire_holds()
+        return [(flight.get_number(), seat) for flight, seat in legs]
+
+    def release(self, hold_id):
+        """Frees the seats of a hold without booking them.
+
+        Args:
+            hold_id (int): The id returned by `hold`.
+        """
+        hold = self.__pop_hold(hold_id)
+        if hold is None:
+            raise ValueError(f"Hold {hold_id} does not exist")
+        _, legs, id_card = hold
+        self.__free(legs, id_card)
+        self.expire_holds()
+
+    def book(self, passenger, legs):
+        """Holds and commits the seats of an itinerary in one call.
+
+        Args:
+            passenger (tuple): The passenger data.
+            legs (iterable): (flight, seat) tuples, one per leg.
+
+        Returns:
+            list: The (flight number, seat) tuples of the booked legs.
+        """
+        return self.commit(self.hold(passenger, legs))
+
+    def cancel(self, passenger, legs):
+        """Frees the seats of a booked itinerary on every leg at once.
+
+        Args:
+            passenger (tuple): The passenger data of the itinerary.
+            legs (iterable): (flight, seat) tuples, one per leg.
+        """
+        legs = tuple(legs)
+        self.expire_holds()
+        with self.__locked(flight for flight, _ in legs):
+            # Check every leg before freeing any, so a bad leg changes nothing.
+            for flight, seat in legs:
+                occupant = flight.get_passenger(seat)
+                if occupant is None:
+                    raise ValueError(f"Seat {seat} on flight {flight.get_number()} is not occupied")
+                if occupant[2] != passenger[2]:
+                    raise ValueError(f"Seat {seat} on flight {flight.get_number()} is not held by passenger {passenger[2]}")
+            for flight, seat in legs:
+                flight.deallocate_passenger(seat)
+
+    def num_holds(self):
+        """Gets the number of holds that are neither committed nor released.
+
+        Returns:
+            int: The number of pending holds.
+        """
+        with self.__holds_lock:
+            return len(self.__holds)
+
+    def expire_holds(self):
+        """Frees the seats of every expired hold.
+
+        Returns:
+            int: The number of holds that expired.
+        """
+        now = self.__clock()
+        with self.__holds_lock:
+            expired = [hold_id for hold_id, (expires_at, _, _) in self.__holds.items() if now >= expires_at]
+            expired_holds = [self.__pop_hold(hold_id, locked=True) for hold_id in expired]
+        for _, legs, id_card in expired_holds:
+            self.__free(legs, id_card)
+        return len(expired_holds)
+
+    def __pop_hold(self, hold_id, locked=False):
+        """Removes a hold and forgets its seats.
+
+        Args:
+            hold_id (int): The id of the hold.
+            locked (bool): Whether the caller already holds the holds lock.
+
+        Returns:
+            tuple: The (expires_at, legs, id_card) tuple of the hold, or None if it does not exist.
+        """
+        with contextlib.nullcontext() if locked else self.__holds_lock:
+            hold = self.__holds.pop(hold_id, None)
+            if hold is not None:
+                for flight, seat in hold[1]:
+                    self.__held_seats.pop((flight.get_number(), seat), None)
+        return hold
+
+    def __on_seat_event(self, number, event):
+        """Moves a held leg along when its passenger is reallocated to another seat.
+
+        Args:
+            number (str): The number of the flight that published the event.
+            event (tuple): The seat change event.
+        """
+        _, action, from_seat, to_seat, passenger = event
+        if action != "reallocate":
+            return
+        with self.__holds_lock:
+            hold_id = self.__held_seats.get((number, from_seat))
+            if hold_id is None:
+                return
+            expires_at, legs, id_card = self.__holds[hold_id]
+            if passenger[2] != id_card:
+                return
+            del self.__held_seats[(number, from_seat)]
+            self.__held_seats[(number, to_seat)] = hold_id
+            legs = tuple((flight, to_seat) if (flight.get_number(), seat) == (number, from_seat) else (flight, seat)
+                         for flight, seat in legs)
+            self.__holds[hold_id] = (expires_at, legs, id_card)
+
+    def __free(self, legs, id_card):
+        """Deallocates the seats of a hold that are still held by its passenger.
+
+        Seats that were reallocated or freed since the hold was placed are
+        left alone, so another passenger sitting there is never evicted.
+
+        Args:
+            legs (tuple): (flight, seat) tuples, one per leg.
+            id_card (str): The identification card number of the passenger of the hold.
+        """
+        with self.__locked(flight for flight, _ in legs):
+            for flight, seat in legs:
+                occupant = flight.get_passenger(seat)
+                if occupant is not None and occupant[2] == id_card:
+                    flight.deallocate_passenger(seat)
+
+    @contextlib.contextmanager
+    def __locked(self, flights):
+        """Holds the locks of several flights, acquired in flight number order.
+
+        The booker starts following the seat changes of a flight the first
+        time it locks it.
+
+        Args:
+            flights (iterable): The flights to lock. Repeated flights are locked once.
+        """
+        flights = {flight.get_number(): flight for flight in flights}
+        with self.__flight_locks_lock:
+            locks = []
+            for number in sorted(flights):
+                if number not in self.__flight_locks:
+                    self.__flight_locks[number] = threading.Lock()
+                    flights[number].get_event_feed().subscribe(functools.partial(self.__on_seat_event, number))
+                locks.append(self.__flight_locks[number])
+        with contextlib.ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+            yield
@@ -0,0 +1,128 @@
+"""
+Author: Manuel Borregales
+
+This module reads and writes flight manifests.
+
+A manifest is a JSONL file with one flight per line, so it can be
+processed one flight at a time:
+
+    {"number": "BA117", "aircraft": {"type": "airbus", "registration": "G-EUAH", "variant": "A319-100"},
+     "passengers": [{"seat": "12A", "name": "Jack", "surname": "Shephard", "id_card": "85994003S"}]}
+
+Aircraft types are "airbus" (registration, variant), "boeing" (registration,
+airline) and "aircraft" (registration, model, and either num_rows and
+num_seats_per_row or a cabin as returned by CabinConfiguration.to_dict).
+
+Functions:
+    make_aircraft: Builds an aircraft from its description.
+    read_manifest: Yields the flight records of a manifest file.
+    load_flight: Builds a flight from its record.
+    dump_flight: Builds the record of a flight.
+"""
+
+import json
+
+from src.aircraft import Aircraft, Airbus, Boeing
+from src.cabin import CabinConfiguration
+from src.flight import Flight
+from src.passenger import Passenger
+
+def make_aircraft(spec):
+    """Builds an aircraft from its description.
+
+    Args:
+        spec (dict): The aircraft description, with a "type" key.
+
+    Returns:
+        Aircraft: The aircraft.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("An aircraft description must be an object.")
+    kind = spec.get("type")
+    try:
+        if kind == "airbus":
+            return Airbus(registration=spec["registration"], variant=spec["variant"])
+        if kind == "boeing":
+            return Boeing(registration=spec["registration"], airline=spec["airline"])
+        if kind == "aircraft" and "cabin" in spec:
+            return Aircraft(registration=spec["registration"], model=spec["model"],
+                            cabin=CabinConfiguration.from_dict(spec["cabin"]))
+        if kind == "aircraft":
+            return Aircraft(registration=spec["registration"], model=spec["model"],
+                            num_rows=spec["num_rows"], num_seats_per_row=spec["num_seats_per_row"])
+    except KeyError as e:
+        raise ValueError(f"Aircraft of type {kind} is missing {e}.") from None
+    raise ValueError(f"Unknown aircraft type {kind}.")
+
+def read_manifest(lines):
+    """Yields the flight records of a manifest, one line at a time.
+
+    Args:
+        lines (iterable): The lines of the manifest, such as an open file.
+
+    Yields:
+        dict: The record of each flight.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid manifest line {line_number}: {e.msg}.") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Invalid manifest line {line_number}: a flight record must be an object.")
+        yield record
+
+def load_flight(record, passenger_index=None):
+    """Builds a flight from its record, allocating its passengers.
+
+    Args:
+        record (dict): The flight record.
+        passenger_index (PassengerIndex): A fleet-wide index to register the passengers in.
+
+    Returns:
+        Flight: The flight.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("A flight record must be an object.")
+    bookings = record.get("passengers", [])
+    if not isinstance(bookings, list):
+        raise ValueError("The passengers of a flight record must be a list.")
+    try:
+        number = record["number"]
+        if not isinstance(number, str):
+            raise ValueError("Flight number must be a string.")
+        flight = Flight(number, make_aircraft(record["aircraft"]), passenger_index=passenger_index)
+        for booking in bookings:
+            if not isinstance(booking, dict):
+                raise ValueError(f"Every booking of flight {number} must be an object.")
+            fields = (booking["seat"], booking["name"], booking["surname"], booking["id_card"])
+            if not all(isinstance(field, str) for field in fields):
+                raise ValueError(f"The seat, name, surname and ID card of every booking of flight {number} must be strings.")
+            seat, name, surname, id_card = fields
+            passenger = Passenger(name, surname, id_card)
+            flight.allocate_passenger(seat, passenger.passenger_data())
+    except KeyError as e:
+        raise ValueError(f"Flight record is missing {e}.") from None
+    return flight
+
+def dump_flight(flight, aircraft_spec):
+    """Builds the record of a flight.
+
+    Args:
+        flight (Flight): The flight.
+        aircraft_spec (dict): The description of the aircraft of the flight.
+
+    Returns:
+        dict: The flight record.
+    """
+    passengers = []
+    for row_number, row in enumerate(flight.get_seating()):
+        if row is None:
+            continue
+        for letter, passenger in row.items():
+            if passenger is not None:
+                name, surname, id_card = passenger
+                passengers.append({"seat": f"{row_number}{letter}", "name": name, "surname": surname, "id_card": id_card})
+    return {"number": flight.get_number(), "aircraft": aircraft_spec, "passengers": passengers}
@@ -0,0 +1,167 @@
+"""
+Author: Manuel Borregales
+
+This module defines the PassengerIndex class for tracking bookings across a fleet.
+
+Classes:
+    PassengerIndex: Maps each passenger ID to all the seats it holds on every flight.
+"""
+
+import threading
+
+class PassengerIndex:
+    def __init__(self, allow_multiple_flights=True):
+        """Initializes a PassengerIndex instance.
+
+        Flights created with `passenger_index=` keep the index up to date on
+        every allocation, reallocation and deallocation, and ask it before
+        seating a passenger. A passenger can never hold two seats on the same
+        flight.
+
+        The index is shared by the flights of a fleet, which can be changed
+        from different threads, so every method holds the index's lock.
+
+        Args:
+            allow_multiple_flights (bool): Whether a passenger can be booked on
+                several flights, e.g. for connecting itineraries.
+        """
+        self.__allow_multiple_flights = allow_multiple_flights
+        # Maps each ID card to a tuple of (flight number, seat) tuples. Tuples
+        # keep the memory low, and passengers hold only a handful of seats.
+        self.__bookings = {}
+        # ID cards booked on more than one flight.
+        self.__multiple_flights = set()
+        self.__lock = threading.Lock()
+
+    def num_passengers(self):
+        """Gets the number of passengers holding at least one seat.
+
+        Returns:
+            int: The number of passengers.
+        """
+        with self.__lock:
+            return len(self.__bookings)
+
+    def is_booked(self, id_card, flight_number=None):
+        """Checks whether a passenger holds a seat.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+            flight_number (str): If given, only this flight is checked.
+
+        Returns:
+            bool: True if the passenger holds a seat; False otherwise.
+        """
+        with self.__lock:
+            holdings = self.__bookings.get(id_card, ())
+        if flight_number is None:
+            return bool(holdings)
+        return any(number == flight_number for number, _ in holdings)
+
+    def bookings_for(self, id_card):
+        """Gets all the seats held by a passenger.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+
+        Returns:
+            list: (flight number, seat) tuples, in booking order.
+        """
+        with self.__lock:
+            return list(self.__bookings.get(id_card, ()))
+
+    def find_double_bookings(self):
+        """Gets the passengers booked on more than one flight.
+
+        Returns:
+            dict: Maps each of those ID cards to its (flight number, seat) tuples.
+        """
+        with self.__lock:
+            return {id_card: list(self.__bookings[id_card]) for id_card in self.__multiple_flights}
+
+    def check_booking(self, id_card, flight_number):
+        """Verifies that a passenger can be seated on a flight.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+            flight_number (str): The flight number.
+
+        Raises:
+            ValueError: If the passenger already holds a seat on the flight, or
+                on another flight when multiple flights are not allowed.
+        """
+        with self.__lock:
+            self.__check_booking(id_card, flight_number)
+
+    def record_allocation(self, id_card, flight_number, seat):
+        """Adds a seat to the bookings of a passenger, if the passenger can be seated.
+
+        The check and the update are done at once, so two flights cannot both
+        seat a passenger that only one of them may seat.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+            flight_number (str): The flight number.
+            seat (str): The seat designator.
+
+        Raises:
+            ValueError: If the passenger cannot be seated, as for `check_booking`.
+        """
+        with self.__lock:
+            self.__check_booking(id_card, flight_number)
+            holdings = self.__bookings.get(id_card, ()) + ((flight_number, seat),)
+            self.__bookings[id_card] = holdings
+            if len(holdings) > 1:
+                self.__multiple_flights.add(id_card)
+
+    def record_reallocation(self, id_card, flight_number, from_seat, to_seat):
+        """Moves a booking of a passenger to another seat of the same flight.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+            flight_number (str): The flight number.
+            from_seat (str): The previous seat designator.
+            to_seat (str): The new seat designator.
+        """
+        with self.__lock:
+            holdings = self.__bookings.get(id_card, ())
+            if (flight_number, from_seat) not in holdings:
+                # Never fail the flight over a booking the index does not know,
+                # record the seat the passenger now holds instead.
+                holdings += ((flight_number, from_seat),)
+            self.__bookings[id_card] = holdings = tuple(
+                (number, to_seat) if (number, seat) == (flight_number, from_seat) else (number, seat)
+                for number, seat in holdings
+            )
+            if len(holdings) > 1:
+                self.__multiple_flights.add(id_card)
+
+    def record_deallocation(self, id_card, flight_number, seat):
+        """Removes a seat from the bookings of a passenger.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+            flight_number (str): The flight number.
+            seat (str): The seat designator.
+        """
+        with self.__lock:
+            # A booking the index does not know is already gone.
+            holdings = tuple(holding for holding in self.__bookings.get(id_card, ())
+                             if holding != (flight_number, seat))
+            if holdings:
+                self.__bookings[id_card] = holdings
+            else:
+                self.__bookings.pop(id_card, None)
+            if len(holdings) <= 1:
+                self.__multiple_flights.discard(id_card)
+
+    def __check_booking(self, id_card, flight_number):
+        """Verifies that a passenger can be seated on a flight. The caller holds the lock.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+            flight_number (str): The flight number.
+        """
+        for number, seat in self.__bookings.get(id_card, ()):
+            if number == flight_number or not self.__allow_multiple_flights:
+                raise ValueError(f"Passenger {id_card} is already booked on flight {number} in seat {seat}")
@@ -0,0 +1,212 @@
+"""
+Author: Manuel Borregales
+
+This module defines the classes for comparing two states of a flight.
+
+Classes:
+    FlightSnapshot: A frozen copy of the seating of a flight.
+    ManifestDiff: The passengers added, removed, moved and changed between two flight states.
+
+Functions:
+    diff_fleets: Compares two fleets of flights, skipping the flights that did not change.
+"""
+
+from collections import defaultdict
+
+class FlightSnapshot:
+    def __init__(self, flight):
+        """Initializes a FlightSnapshot instance from the current state of a flight.
+
+        A snapshot has the same getters as a Flight for its number, seating
+        and fingerprints, so both can be compared with a ManifestDiff.
+
+        Args:
+            flight (Flight): The flight to copy.
+        """
+        self.__number = flight.get_number()
+        self.__seating = [None if row is None else dict(row) for row in flight.get_seating()]
+        self.__row_fingerprints = flight.get_row_fingerprints()
+        self.__fingerprint = flight.get_fingerprint()
+
+    def get_number(self):
+        """Gets the flight number.
+
+        Returns:
+            str: The flight number.
+        """
+        return self.__number
+
+    def get_seating(self):
+        """Gets the seating plan at the time of the snapshot.
+
+        Returns:
+            list: The seating plan, in the same layout as Flight.get_seating.
+        """
+        return self.__seating
+
+    def get_row_fingerprints(self):
+        """Gets the fingerprint of each row at the time of the snapshot.
+
+        Returns:
+            tuple: One integer per row.
+        """
+        return self.__row_fingerprints
+
+    def get_fingerprint(self):
+        """Gets the fingerprint of the whole flight at the time of the snapshot.
+
+        Returns:
+            int: The combined fingerprint of every row.
+        """
+        return self.__fingerprint
+
+class ManifestDiff:
+    def __init__(self, old, new):
+        """Initializes a ManifestDiff instance comparing two states of a flight.
+
+        Only the rows whose fingerprints differ are inspected, so the cost
+        depends on the number of changed rows rather than on the size of
+        the aircraft. Passengers are matched by their ID card.
+
+        Args:
+            old (Flight or FlightSnapshot): The earlier or reference state.
+            new (Flight or FlightSnapshot): The later or compared state.
+        """
+        self.__added = []
+        self.__removed = []
+        self.__moved = []
+        self.__changed = []
+        if old.get_fingerprint() != new.get_fingerprint():
+            self.__compare(old, new)
+
+    def get_added(self):
+        """Gets the passengers that are only seated in the new state.
+
+        Returns:
+            list: (seat, passenger) tuples.
+        """
+        return self.__added
+
+    def get_removed(self):
+        """Gets the passengers that are only seated in the old state.
+
+        Returns:
+            list: (seat, passenger) tuples.
+        """
+        return self.__removed
+
+    def get_moved(self):
+        """Gets the passengers that are seated in a different seat.
+
+        Returns:
+            list: (from_seat, to_seat, passenger) tuples, with the passenger data of the new state.
+        """
+        return self.__moved
+
+    def get_changed(self):
+        """Gets the passengers whose data changed, matched by ID card.
+
+        A passenger who also moved is reported both here and in `get_moved`.
+
+        Returns:
+            list: (seat, old_passenger, new_passenger) tuples, with the seat of the new state.
+        """
+        return self.__changed
+
+    def is_empty(self):
+        """Checks whether both states have the same passengers in the same seats.
+
+        Returns:
+            bool: True if nothing changed; False otherwise.
+        """
+        return not (self.__added or self.__removed or self.__moved or self.__changed)
+
+    def __compare(self, old, new):
+        """Fills in the differences by inspecting the rows with different fingerprints.
+
+        Args:
+            old (Flight or FlightSnapshot): The earlier or reference state.
+            new (Flight or FlightSnapshot): The later or compared state.
+        """
+        old_seating, new_seating = old.get_seating(), new.get_seating()
+        old_fingerprints, new_fingerprints = old.get_row_fingerprints(), new.get_row_fingerprints()
+        # Seats that lost or gained an occupant, grouped by ID card.
+        vacated = defaultdict(list)
+        occupied = defaultdict(list)
+
+        for row_number in range(1, max(len(old_seating), len(new_seating))):
+            old_row = old_seating[row_number] if row_number < len(old_seating) else None
+            new_row = new_seating[row_number] if row_number < len(new_seating) else None
+            if old_row is not None and new_row is not None \
+                    and old_fingerprints[row_number] == new_fingerprints[row_number]:
+                continue
+
+            old_row = old_row or {}
+            new_row = new_row or {}
+            for letter in {**old_row, **new_row}:
+                old_passenger = old_row.get(letter)
+                new_passenger = new_row.get(letter)
+                if old_passenger == new_passenger:
+                    continue
+                seat = f"{row_number}{letter}"
+                if old_passenger is not None and new_passenger is not None \
+                        and old_passenger[2] == new_passenger[2]:
+                    self.__changed.append((seat, old_passenger, new_passenger))
+                    continue
+                if old_passenger is not None:
+                    vacated[old_passenger[2]].append((seat, old_passenger))
+                if new_passenger is not None:
+                    occupied[new_passenger[2]].append((seat, new_passenger))
+
+        for id_card, old_seats in vacated.items():
+            new_seats = occupied.pop(id_card, [])
+            for (from_seat, old_passenger), (to_seat, passenger) in zip(old_seats, new_seats):
+                self.__moved.append((from_seat, to_seat, passenger))
+                if old_passenger != passenger:
+                    self.__changed.append((to_seat, old_passenger, passenger))
+            self.__removed.extend(old_seats[len(new_seats):])
+            self.__added.extend(new_seats[len(old_seats):])
+        for new_seats in occupied.values():
+            self.__added.extend(new_seats)
+
+def diff_fleets(old_flights, new_flights):
+    """Compares two fleets of flights, matched by flight number.
+
+    Flights whose overall fingerprints match are skipped without looking
+    at their rows, so reconciling mostly identical fleets is close to
+    linear in the number of changes.
+
+    Args:
+        old_flights (iterable): Flights or snapshots of the reference state.
+        new_flights (iterable): Flights or snapshots of the compared state.
+
+    Returns:
+        dict: Maps the number of every flight that differs to its ManifestDiff.
+            A flight missing on one side is compared with an empty flight.
+    """
+    old_by_number = {flight.get_number(): flight for flight in old_flights}
+    new_by_number = {flight.get_number(): flight for flight in new_flights}
+
+    numbers = list(old_by_number) + [number for number in new_by_number if number not in old_by_number]
+    diffs = {}
+    for number in numbers:
+        old = old_by_number.get(number, _EMPTY_FLIGHT)
+        new = new_by_number.get(number, _EMPTY_FLIGHT)
+        if old.get_fingerprint() == new.get_fingerprint():
+            continue
+        diffs[number] = ManifestDiff(old, new)
+    return diffs
+
+class _EmptyFlight:
+    """Stands in for a flight that only exists in one of the fleets."""
+
+    def get_seating(self):
+        return [None]
+
+    def get_row_fingerprints(self):
+        return (0,)
+
+    def get_fingerprint(self):
+        return 0
+
+_EMPTY_FLIGHT = _EmptyFlight()
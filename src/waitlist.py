@@ -0,0 +1,242 @@
+"""
+Author: Manuel Borregales
+
+This module defines the Waitlist class for passengers that a full flight cannot seat yet.
+
+Classes:
+    Waitlist: Holds passengers that could not be seated and seats them when a seat is freed.
+"""
+
+import heapq
+import itertools
+import time
+
+class Waitlist:
+    def __init__(self, flight, capacity=None, clock=time.monotonic):
+        """Initializes a Waitlist instance for the given flight.
+
+        The waitlist listens to the flight's seat change events, so every
+        deallocated seat is given to the waitlisted passenger with the
+        highest priority, until it is closed.
+
+        Args:
+            flight (Flight): The flight the waitlist belongs to.
+            capacity (int): The maximum number of passengers waiting at once, i.e. how
+                far the flight can be overbooked. None means no limit.
+            clock (callable): Returns the current time in seconds. Every request
+                timestamp is compared on this clock.
+        """
+        if capacity is not None:
+            if not isinstance(capacity, int):
+                raise ValueError("Capacity must be an integer.")
+            if capacity < 0:
+                raise ValueError("Capacity cannot be negative.")
+
+        self.__flight = flight
+        self.__capacity = capacity
+        self.__clock = clock
+        self.__closed = False
+        # Heap of [tier, timestamp, counter, passenger, preferences, active] entries.
+        self.__heap = []
+        self.__entries = {}
+        self.__counter = itertools.count()
+        flight.get_event_feed().subscribe(self.__on_seat_event)
+
+    def get_capacity(self):
+        """Gets the maximum number of passengers waiting at once.
+
+        Returns:
+            int: The capacity of the waitlist, or None if it has no limit.
+        """
+        return self.__capacity
+
+    def get_size(self):
+        """Gets the number of passengers waiting for a seat.
+
+        Returns:
+            int: The number of waitlisted passengers.
+        """
+        return len(self.__entries)
+
+    def is_waitlisted(self, id_card):
+        """Checks whether a passenger is waiting for a seat.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+
+        Returns:
+            bool: True if the passenger is on the waitlist; False otherwise.
+        """
+        return id_card in self.__entries
+
+    def request_seat(self, passenger, tier=0, preferences=(), timestamp=None):
+        """Seats a passenger, or waitlists them if the flight is full.
+
+        Passengers are promoted by tier (lower tiers first) and then by the
+        time of the request.
+
+        Args:
+            passenger (tuple): The passenger data (e.g., ('Jack', 'Shephard', '85994003S')).
+            tier (int): The priority tier of the passenger, 0 being the highest.
+            preferences (iterable): Seat designators the passenger prefers, best first.
+            timestamp (float): The time of the request on the waitlist's clock, e.g.
+                when replaying earlier requests. Defaults to the current time.
+
+        Returns:
+            str: The allocated seat designator, or None if the passenger was waitlisted.
+        """
+        if self.__closed:
+            raise ValueError(f"Waitlist for flight {self.__flight.get_number()} is closed")
+        if not isinstance(tier, int) or tier < 0:
+            raise ValueError("Tier must be a non-negative integer.")
+
+        id_card = passenger[2]
+        if id_card in self.__entries:
+            raise ValueError(f"Passenger {id_card} is already waitlisted")
+
+        preferences = tuple(preferences)
+        # Validate the designators up front so promotions never fail on them.
+        for seat in preferences:
+            self.__flight.is_seat_available(seat)
+
+        if self.__flight.num_available_seats() > 0:
+            seat = self.__preferred_seat(preferences)
+            if seat is None:
+                seat = self.__first_available_seat()
+            self.__flight.allocate_passenger(seat, passenger)
+            return seat
+
+        if self.__capacity is not None and len(self.__entries) >= self.__capacity:
+            raise ValueError(f"Waitlist for flight {self.__flight.get_number()} is full")
+        index = self.__flight.get_passenger_index()
+        if index is not None:
+            # Reject passengers the flight would refuse, rather than at promotion.
+            index.check_booking(id_card, self.__flight.get_number())
+
+        if timestamp is None:
+            timestamp = self.__clock()
+        entry = [tier, timestamp, next(self.__counter), passenger, preferences, True]
+        self.__entries[id_card] = entry
+        heapq.heappush(self.__heap, entry)
+        return None
+
+    def cancel(self, id_card):
+        """Removes a passenger from the waitlist.
+
+        Args:
+            id_card (str): The identification card number of the passenger.
+        """
+        entry = self.__entries.pop(id_card, None)
+        if entry is None:
+            raise ValueError(f"Passenger {id_card} is not waitlisted")
+        # The entry stays in the heap and is skipped when it reaches the top,
+        # until cancelled entries outnumber the waiting ones.
+        entry[-1] = False
+        if len(self.__heap) > 2 * len(self.__entries):
+            self.__heap = list(self.__entries.values())
+            heapq.heapify(self.__heap)
+
+    def close(self):
+        """Stops listening to the flight and removes every waitlisted passenger.
+
+        A closed waitlist no longer promotes anybody, so it can be replaced
+        or discarded without taking the freed seats.
+
+        Returns:
+            list: The passenger data of the passengers that were still waiting,
+                in promotion order.
+        """
+        if self.__closed:
+            return []
+        self.__flight.get_event_feed().unsubscribe(self.__on_seat_event)
+        self.__closed = True
+        waiting = [entry[3] for entry in sorted(self.__entries.values())]
+        self.__entries.clear()
+        self.__heap.clear()
+        return waiting
+
+    def get_heap_size(self):
+        """Gets the number of entries in the heap, cancelled ones included.
+
+        Returns:
+            int: The size of the heap.
+        """
+        return len(self.__heap)
+
+    def __on_seat_event(self, event):
+        """Promotes the next waitlisted passenger when a seat is deallocated.
+
+        Args:
+            event (tuple): The seat change event published by the flight.
+        """
+        _, action, from_seat, _, _ = event
+        if action == "deallocate":
+            self.__promote(from_seat)
+
+    def __promote(self, freed_seat):
+        """Gives a freed seat, or a preferred one if free, to the highest priority passenger.
+
+        Passengers the passenger index refuses, because they were booked
+        since joining the waitlist, are dropped and the seat goes to the next
+        passenger. If the seat was taken in the meantime, e.g. by another
+        waitlist, the passenger keeps their place.
+
+        Args:
+            freed_seat (str): The seat designator that has just been freed.
+
+        Returns:
+            str: The allocated seat designator, or None if nobody could be seated.
+        """
+        index = self.__flight.get_passenger_index()
+        while self.__heap:
+            entry = heapq.heappop(self.__heap)
+            if not entry[-1]:
+                continue
+
+            _, _, _, passenger, preferences, _ = entry
+            id_card = passenger[2]
+            if index is not None:
+                try:
+                    index.check_booking(id_card, self.__flight.get_number())
+                except ValueError:
+                    del self.__entries[id_card]
+                    continue
+
+            seat = self.__preferred_seat(preferences)
+            if seat is None and self.__flight.is_seat_available(freed_seat):
+                seat = freed_seat
+            if seat is None:
+                seat = self.__first_available_seat()
+            if seat is None:
+                heapq.heappush(self.__heap, entry)
+                return None
+            try:
+                self.__flight.allocate_passenger(seat, passenger)
+            except BaseException:
+                heapq.heappush(self.__heap, entry)
+                raise
+            del self.__entries[id_card]
+            return seat
+        return None
+
+    def __preferred_seat(self, preferences):
+        """Finds the first available seat among the preferences.
+
+        Args:
+            preferences (tuple): Seat designators, best first.
+
+        Returns:
+            str: The first available preferred seat, or None if all are taken.
+        """
+        for seat in preferences:
+            if self.__flight.is_seat_available(seat):
+                return seat
+        return None
+
+    def __first_available_seat(self):
+        """Finds the first available seat of the flight, front to back.
+
+        Returns:
+            str: The seat designator, or None if the flight is full.
+        """
+        return next(self.__flight.find_available_seats(), None)
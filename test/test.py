@@ -5,10 +5,21 @@ This module contains comprehensive tests for the Flight, Aircraft, and Passenger
 focusing on both normal operation and edge cases.
 """
 
+import sys
+import threading
+
 import pytest
 from src.flight import Flight
 from src.aircraft import Aircraft, Boeing, Airbus
 from src.passenger import Passenger
+from src.cabin import CabinConfiguration
+from src.events import SeatEventFeed
+from src.waitlist import Waitlist
+from src.itinerary import ItineraryBooker
+from src.reconcile import FlightSnapshot, ManifestDiff, diff_fleets
+from src.manifest import dump_flight, load_flight, make_aircraft, read_manifest
+from src.cli import main
+from src.passenger_index import PassengerIndex
 
 
 # Fixtures for reusable test objects
@@ -111,6 +122,99 @@ class TestAircraft:
         assert seats == "AB"
 
 
+class TestCabin:
+    """Test cases for cabin configurations"""
+
+    @pytest.fixture
+    def cabin(self):
+        """A cabin with two zones, an aisle, a skipped row, a blocked seat and an exit row"""
+        return CabinConfiguration(
+            zones=[("economy", 10, 14, "ABC HJK"), ("business", 1, 2, "AC DF")],
+            blocked_seats=["11B"],
+            exit_rows=[12],
+            skipped_rows=[13],
+        )
+
+    @pytest.fixture
+    def cabin_flight(self, cabin):
+        return Flight(number="BA123", aircraft=Aircraft(registration="G-EUPT", model="Test", cabin=cabin))
+
+    def test_compiled_cabin(self, cabin):
+        """Test the seat index, zones and rows of a compiled cabin"""
+        compiled = cabin.compile()
+        assert compiled.num_seats() == 2 * 4 + 4 * 6 - 1
+        assert compiled.get_zone_names() == ("business", "economy")
+        assert compiled.get_zone_range("business") == range(0, 8)
+        assert compiled.get_designator(compiled.get_seat_index("10H")) == "10H"
+        assert compiled.get_seat_index("11B") is None
+        assert compiled.get_row_letters()[13] is None
+        assert compiled.get_row_letters()[11] == "ACHJK"
+        assert compiled.is_exit_row(12) and not compiled.is_exit_row(11)
+
+    def test_compiled_once_per_configuration(self, cabin):
+        """Test that equal configurations share their compiled cabin"""
+        assert Airbus(registration="G-EUPT", variant="A319-100").get_compiled_cabin() \
+            is Airbus(registration="G-EUAH", variant="A319-200").get_compiled_cabin()
+        assert CabinConfiguration.from_dict(cabin.to_dict()).compile() is cabin.compile()
+
+    def test_flight_with_cabin(self, cabin_flight, standard_passenger):
+        """Test seating, counts and searches of a flight with a configured cabin"""
+        seating = cabin_flight.get_seating()
+        assert seating[2] == {"A": None, "C": None, "D": None, "F": None}
+        assert seating[5] is None and seating[13] is None
+        assert cabin_flight.num_available_seats() == 31
+        assert cabin_flight.num_available_seats("business") == 8
+
+        cabin_flight.allocate_passenger("1A", standard_passenger.passenger_data())
+        cabin_flight.reallocate_passenger("1A", "10A")
+        assert cabin_flight.num_available_seats("business") == 8
+        assert cabin_flight.num_available_seats("economy") == 22
+        assert list(cabin_flight.find_available_seats("economy"))[:3] == ["10B", "10C", "10H"]
+
+        with pytest.raises(ValueError, match="The zone must be one of business, economy"):
+            cabin_flight.num_available_seats("first")
+
+    @pytest.mark.parametrize("seat,message", [
+        ("13A", "Row 13 does not exist"),
+        ("5A", "Row 5 does not exist"),
+        ("15A", "The row number must be between 1 and 14"),
+        ("11B", "The seat is blocked"),
+        ("1B", "The seat letter must be one of ACDF in row 1"),
+        ("10I", "The seat letter must be one of ABCHJK in row 10"),
+    ])
+    def test_invalid_cabin_seats(self, cabin_flight, standard_passenger, seat, message):
+        """Test that seats outside the configured cabin are rejected"""
+        with pytest.raises(ValueError, match=message):
+            cabin_flight.allocate_passenger(seat, standard_passenger.passenger_data())
+
+    def test_adjacent_seats(self, cabin_flight):
+        """Test that adjacency stops at aisles and blocked seats"""
+        assert cabin_flight.adjacent_seats("10B") == ["10A", "10C"]
+        assert cabin_flight.adjacent_seats("10C") == ["10B"]
+        assert cabin_flight.adjacent_seats("11A") == []
+        assert cabin_flight.adjacent_seats("1D") == ["1F"]
+
+    def test_invalid_configurations(self):
+        """Test that invalid cabin descriptions are rejected"""
+        with pytest.raises(ValueError, match="Zone economy shares rows with another zone"):
+            CabinConfiguration([("business", 1, 5, "ABCD"), ("economy", 5, 20, "ABCDEF")])
+        with pytest.raises(ValueError, match="Letters of zone economy must be uppercase letters"):
+            CabinConfiguration([("economy", 1, 20, "abc")])
+        with pytest.raises(ValueError, match="Blocked seat 3G is not a seat of the cabin"):
+            CabinConfiguration([("economy", 1, 20, "ABCDEF")], blocked_seats=["3G"])
+        with pytest.raises(ValueError, match="Exit row 13 is not a row of the cabin"):
+            CabinConfiguration([("economy", 1, 20, "ABCDEF")], exit_rows=[13], skipped_rows=[13])
+        with pytest.raises(ValueError, match="A cabin must have at least one row that is not skipped"):
+            CabinConfiguration([("economy", 1, 2, "ABCDEF")], skipped_rows=[1, 2])
+        with pytest.raises(ValueError, match="Blocked seat 12 must be a string"):
+            CabinConfiguration([("economy", 1, 20, "ABCDEF")], blocked_seats=["3A", 12])
+        with pytest.raises(ValueError, match="Skipped row '13' must be an integer"):
+            CabinConfiguration([("economy", 1, 20, "ABCDEF")], skipped_rows=["13"])
+        with pytest.raises(ValueError, match="Give either a cabin or the number of rows"):
+            Aircraft(registration="G-ABCD", model="Test", num_rows=10, num_seats_per_row=4,
+                     cabin=CabinConfiguration.uniform(10, 4))
+
+
 class TestPassenger:
     """Test cases for the Passenger class"""
 
@@ -289,6 +393,670 @@ class TestFlight:
         assert flight.get_aircraft_model() == standard_aircraft.get_model()
 
 
+class TestSeatEvents:
+    """Test cases for the seat change event feed"""
+
+    def test_events_are_published(self, standard_flight, standard_passenger):
+        """Test that allocate, reallocate and deallocate publish events"""
+        passenger_data = standard_passenger.passenger_data()
+        standard_flight.allocate_passenger("1A", passenger_data)
+        standard_flight.reallocate_passenger("1A", "2B")
+        assert standard_flight.deallocate_passenger("2B") == passenger_data
+
+        events = standard_flight.get_event_feed().events_since(0)
+        assert events == [
+            (1, "allocate", None, "1A", passenger_data),
+            (2, "reallocate", "1A", "2B", passenger_data),
+            (3, "deallocate", "2B", None, passenger_data),
+        ]
+        assert standard_flight.get_seating()[2]["B"] is None
+
+    def test_deallocate_empty_seat(self, standard_flight):
+        """Test deallocating a seat that is not occupied"""
+        with pytest.raises(ValueError, match="Seat 1A is not occupied"):
+            standard_flight.deallocate_passenger("1A")
+        assert standard_flight.get_event_feed().get_last_sequence() == 0
+
+    def test_resume_from_sequence(self, populated_flight):
+        """Test that consumers only receive the deltas after their sequence"""
+        feed = populated_flight.get_event_feed()
+        assert feed.get_last_sequence() == 3
+        populated_flight.deallocate_passenger("5C")
+
+        assert feed.events_since(3) == [(4, "deallocate", "5C", None, ("John", "Doe", "12345678X"))]
+        assert feed.events_since(4) == []
+
+    def test_ring_buffer_drops_old_events(self):
+        """Test that the buffer is bounded and reports dropped events"""
+        feed = SeatEventFeed(capacity=2)
+        for seat in ("1A", "1B", "1C"):
+            feed.publish("allocate", None, seat, ("John", "Doe", "12345678X"))
+
+        assert [event[0] for event in feed.events_since(1)] == [2, 3]
+        with pytest.raises(ValueError, match="no longer available"):
+            feed.events_since(0)
+
+    def test_failing_subscriber_is_isolated(self, capsys):
+        """Test that a failing subscriber neither fails the seat change nor drops queued events"""
+        tiny_aircraft = Aircraft(registration="G-TINY", model="Test", num_rows=1, num_seats_per_row=1)
+        flight = Flight(number="BA999", aircraft=tiny_aircraft)
+        flight.allocate_passenger("1A", ("John", "Doe", "12345678X"))
+        waitlist = Waitlist(flight)
+        waitlist.request_seat(("Alice", "Smith", "12345678Z"))
+        received = []
+
+        def failing(event):
+            raise RuntimeError("boom")
+
+        flight.get_event_feed().subscribe(failing)
+        flight.get_event_feed().subscribe(received.append)
+        assert flight.deallocate_passenger("1A") == ("John", "Doe", "12345678X")
+
+        assert [(event[0], event[1]) for event in received] == [(2, "deallocate"), (3, "allocate")]
+        assert flight.get_passenger("1A") == ("Alice", "Smith", "12345678Z")
+        assert "failed on event 3: RuntimeError('boom')" in capsys.readouterr().err
+
+    def test_subscribe_with_replay(self, populated_flight, standard_passenger):
+        """Test subscribing, replaying and unsubscribing callbacks"""
+        received = []
+        feed = populated_flight.get_event_feed()
+        feed.subscribe(received.append, since=2)
+        populated_flight.allocate_passenger("3D", standard_passenger.passenger_data())
+
+        assert [event[0] for event in received] == [3, 4]
+        assert received[-1][3] == "3D"
+
+        feed.unsubscribe(received.append)
+        populated_flight.deallocate_passenger("3D")
+        assert len(received) == 2
+
+
+class TestWaitlist:
+    """Test cases for the waitlist"""
+
+    @pytest.fixture
+    def full_flight(self):
+        """Create a flight with all of its two seats occupied"""
+        tiny_aircraft = Aircraft(registration="G-TINY", model="Test", num_rows=1, num_seats_per_row=2)
+        flight = Flight(number="BA999", aircraft=tiny_aircraft)
+        flight.allocate_passenger("1A", ("John", "Doe", "12345678X"))
+        flight.allocate_passenger("1B", ("Jane", "Doe", "87654321Y"))
+        return flight
+
+    def test_seats_directly_when_available(self, standard_flight, standard_passenger):
+        """Test that passengers are seated when the flight has room"""
+        waitlist = Waitlist(standard_flight)
+        assert waitlist.request_seat(standard_passenger.passenger_data(), preferences=["3C"]) == "3C"
+        assert waitlist.request_seat(("Alice", "Smith", "12345678Z")) == "1A"
+        assert waitlist.get_size() == 0
+
+    def test_capacity(self, full_flight):
+        """Test that the waitlist rejects passengers beyond its capacity"""
+        waitlist = Waitlist(full_flight, capacity=1)
+        assert waitlist.request_seat(("Alice", "Smith", "12345678Z")) is None
+        assert waitlist.is_waitlisted("12345678Z")
+
+        with pytest.raises(ValueError, match="Waitlist for flight BA999 is full"):
+            waitlist.request_seat(("Bob", "Brown", "11111111B"))
+
+    def test_refills_on_cancellation_by_priority(self, full_flight):
+        """Test that freed seats go to the lowest tier, then the earliest request"""
+        waitlist = Waitlist(full_flight, capacity=3)
+        waitlist.request_seat(("Alice", "Smith", "12345678Z"), tier=1, timestamp=1.0)
+        waitlist.request_seat(("Bob", "Brown", "11111111B"), tier=0, timestamp=3.0)
+        waitlist.request_seat(("Carol", "White", "22222222C"), tier=0, timestamp=2.0)
+
+        full_flight.deallocate_passenger("1B")
+        assert full_flight.get_seating()[1]["B"] == ("Carol", "White", "22222222C")
+        full_flight.deallocate_passenger("1A")
+        assert full_flight.get_seating()[1]["A"] == ("Bob", "Brown", "11111111B")
+        assert waitlist.get_size() == 1
+
+    def test_cancel_waitlisted_passenger(self, full_flight):
+        """Test that cancelled passengers are skipped on promotion"""
+        waitlist = Waitlist(full_flight, capacity=2)
+        waitlist.request_seat(("Alice", "Smith", "12345678Z"), timestamp=1.0)
+        waitlist.request_seat(("Bob", "Brown", "11111111B"), timestamp=2.0)
+        waitlist.cancel("12345678Z")
+
+        full_flight.deallocate_passenger("1A")
+        assert full_flight.get_seating()[1]["A"] == ("Bob", "Brown", "11111111B")
+        assert waitlist.get_size() == 0
+
+        with pytest.raises(ValueError, match="Passenger 12345678Z is not waitlisted"):
+            waitlist.cancel("12345678Z")
+
+    def test_unbounded_by_default(self, full_flight):
+        """Test that a waitlist without a capacity accepts every passenger"""
+        waitlist = Waitlist(full_flight)
+        for i in range(100):
+            assert waitlist.request_seat(("Alice", "Smith", f"{i:08d}Z")) is None
+        assert waitlist.get_capacity() is None
+        assert waitlist.get_size() == 100
+
+    def test_cancelled_entries_are_compacted(self, full_flight):
+        """Test that cancelled entries do not pile up in the heap"""
+        waitlist = Waitlist(full_flight, capacity=2)
+        waitlist.request_seat(("Bob", "Brown", "11111111B"), timestamp=0.0)
+        for i in range(1000):
+            waitlist.request_seat(("Alice", "Smith", "12345678Z"), timestamp=float(i + 1))
+            waitlist.cancel("12345678Z")
+
+        assert waitlist.get_size() == 1
+        assert waitlist.get_heap_size() <= 2
+        full_flight.deallocate_passenger("1A")
+        assert full_flight.get_seating()[1]["A"] == ("Bob", "Brown", "11111111B")
+
+    def test_close(self, full_flight):
+        """Test that a closed waitlist no longer promotes or accepts passengers"""
+        clock = TestItineraryBooker.FakeClock()
+        clock.now = 2.0
+        waitlist = Waitlist(full_flight, clock=clock)
+        waitlist.request_seat(("Bob", "Brown", "11111111B"))
+        waitlist.request_seat(("Alice", "Smith", "12345678Z"), tier=0, timestamp=0.5)
+
+        assert waitlist.close() == [("Alice", "Smith", "12345678Z"), ("Bob", "Brown", "11111111B")]
+        assert waitlist.get_size() == 0
+        full_flight.deallocate_passenger("1A")
+        assert full_flight.get_passenger("1A") is None
+        with pytest.raises(ValueError, match="Waitlist for flight BA999 is closed"):
+            waitlist.request_seat(("Carol", "White", "22222222C"))
+        assert waitlist.close() == []
+
+    def test_promotion_events_in_sequence_order(self, full_flight):
+        """Test that subscribers added after the waitlist receive the events in order"""
+        waitlist = Waitlist(full_flight, capacity=1)
+        waitlist.request_seat(("Alice", "Smith", "12345678Z"))
+        received = []
+        full_flight.get_event_feed().subscribe(received.append)
+
+        full_flight.deallocate_passenger("1A")
+        assert [(event[0], event[1]) for event in received] == [(3, "deallocate"), (4, "allocate")]
+        assert full_flight.get_event_feed().events_since(2) == received
+
+    def test_two_waitlists_on_one_flight(self, full_flight):
+        """Test that a waitlist losing a freed seat to another one keeps its passengers"""
+        first = Waitlist(full_flight)
+        second = Waitlist(full_flight)
+        first.request_seat(("Alice", "Smith", "12345678Z"))
+        for i in range(5):
+            second.request_seat(("Bob", "Brown", f"{i:08d}B"))
+
+        full_flight.deallocate_passenger("1A")
+        assert full_flight.get_passenger("1A") == ("Alice", "Smith", "12345678Z")
+        assert first.get_size() == 0
+        assert second.get_size() == 5
+
+        full_flight.deallocate_passenger("1B")
+        assert full_flight.get_passenger("1B") == ("Bob", "Brown", "00000000B")
+        assert second.get_size() == 4
+
+    def test_respects_passenger_index(self):
+        """Test that passengers the index refuses are neither waitlisted nor promoted"""
+        index = PassengerIndex(allow_multiple_flights=False)
+        tiny_aircraft = Aircraft(registration="G-TINY", model="Test", num_rows=1, num_seats_per_row=2)
+        flight = Flight(number="BA999", aircraft=tiny_aircraft, passenger_index=index)
+        other = Flight(number="BA998", aircraft=tiny_aircraft, passenger_index=index)
+        flight.allocate_passenger("1A", ("John", "Doe", "12345678X"))
+        flight.allocate_passenger("1B", ("Jane", "Doe", "87654321Y"))
+        waitlist = Waitlist(flight)
+
+        with pytest.raises(ValueError, match="Passenger 12345678X is already booked on flight BA999 in seat 1A"):
+            waitlist.request_seat(("John", "Doe", "12345678X"))
+        waitlist.request_seat(("Alice", "Smith", "12345678Z"))
+        waitlist.request_seat(("Bob", "Brown", "11111111B"))
+        other.allocate_passenger("1A", ("Alice", "Smith", "12345678Z"))
+
+        assert flight.deallocate_passenger("1B") == ("Jane", "Doe", "87654321Y")
+        assert flight.get_passenger("1B") == ("Bob", "Brown", "11111111B")
+        assert waitlist.get_size() == 0
+
+        flight.deallocate_passenger("1A")
+        assert flight.get_passenger("1A") is None
+
+    def test_invalid_preferences(self, full_flight):
+        """Test that invalid preferred seats are rejected up front"""
+        waitlist = Waitlist(full_flight, capacity=1)
+        with pytest.raises(ValueError):
+            waitlist.request_seat(("Alice", "Smith", "12345678Z"), preferences=["9Z"])
+        assert waitlist.get_size() == 0
+
+
+class TestItineraryBooker:
+    """Test cases for booking multi-leg itineraries"""
+
+    @pytest.fixture
+    def connecting_flights(self):
+        """Create two flights of a connecting itinerary"""
+        first = Flight(number="BA117", aircraft=Airbus(registration="G-EUAH", variant="A319-100"))
+        second = Flight(number="AF92", aircraft=Boeing(registration="F-GSPS", airline="Emirates"))
+        return first, second
+
+    class FakeClock:
+        def __init__(self):
+            self.now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    def test_book_every_leg(self, connecting_flights, standard_passenger):
+        """Test that a booking allocates a seat on every leg"""
+        first, second = connecting_flights
+        booker = ItineraryBooker()
+        passenger_data = standard_passenger.passenger_data()
+
+        booked = booker.book(passenger_data, [(first, "12A"), (second, "30C")])
+        assert booked == [("BA117", "12A"), ("AF92", "30C")]
+        assert first.get_seating()[12]["A"] == passenger_data
+        assert second.get_seating()[30]["C"] == passenger_data
+        assert booker.num_holds() == 0
+
+    def test_failed_leg_rolls_back(self, connecting_flights, standard_passenger):
+        """Test that no leg is booked when a later leg fails"""
+        first, second = connecting_flights
+        second.allocate_passenger("30C", ("Jane", "Doe", "87654321Y"))
+        booker = ItineraryBooker()
+
+        with pytest.raises(ValueError, match="Seat 30C is already occupied"):
+            booker.hold(standard_passenger.passenger_data(), [(first, "12A"), (second, "30C")])
+        assert first.get_seating()[12]["A"] is None
+        assert booker.num_holds() == 0
+
+    def test_unexpected_error_rolls_back(self, connecting_flights, standard_passenger):
+        """Test that earlier legs are freed whatever exception a later leg raises"""
+        first, second = connecting_flights
+        booker = ItineraryBooker()
+
+        with pytest.raises(IndexError):
+            booker.hold(standard_passenger.passenger_data(), [(first, "1A"), (second, "")])
+        assert first.get_seating()[1]["A"] is None
+        assert first.num_available_seats() == 23 * 6
+        assert booker.num_holds() == 0
+
+    def test_release_hold(self, connecting_flights, standard_passenger):
+        """Test that released holds free their seats"""
+        first, second = connecting_flights
+        booker = ItineraryBooker()
+        hold_id = booker.hold(standard_passenger.passenger_data(), [(first, "12A"), (second, "30C")])
+        assert first.get_seating()[12]["A"] is not None
+
+        booker.release(hold_id)
+        assert first.get_seating()[12]["A"] is None
+        assert second.get_seating()[30]["C"] is None
+        with pytest.raises(ValueError, match=f"Hold {hold_id} does not exist"):
+            booker.commit(hold_id)
+
+    def test_expired_hold(self, connecting_flights, standard_passenger):
+        """Test that expired holds cannot be committed and free their seats"""
+        first, second = connecting_flights
+        clock = self.FakeClock()
+        booker = ItineraryBooker(hold_ttl=60, clock=clock)
+        passenger_data = standard_passenger.passenger_data()
+
+        hold_id = booker.hold(passenger_data, [(first, "12A"), (second, "30C")])
+        clock.now = 60
+        with pytest.raises(ValueError, match=f"Hold {hold_id} has expired"):
+            booker.commit(hold_id)
+        assert first.get_seating()[12]["A"] is None
+
+        booker.hold(passenger_data, [(first, "1A")], ttl=10)
+        clock.now = 100
+        assert booker.expire_holds() == 1
+        assert first.get_seating()[1]["A"] is None
+
+    def test_commit_and_release_expire_other_holds(self, connecting_flights, standard_passenger):
+        """Test that expired holds are freed by any call to the booker"""
+        first, second = connecting_flights
+        clock = self.FakeClock()
+        booker = ItineraryBooker(hold_ttl=60, clock=clock)
+
+        booker.hold(standard_passenger.passenger_data(), [(first, "12A")], ttl=10)
+        hold_id = booker.hold(("Jane", "Doe", "87654321Y"), [(second, "30C")])
+        clock.now = 10
+        assert booker.commit(hold_id) == [("AF92", "30C")]
+        assert first.get_passenger("12A") is None
+        assert booker.num_holds() == 0
+
+    def test_cancel_itinerary(self, connecting_flights, standard_passenger):
+        """Test cancelling every leg of a booked itinerary"""
+        first, second = connecting_flights
+        booker = ItineraryBooker()
+        legs = [(first, "12A"), (second, "30C")]
+        passenger_data = standard_passenger.passenger_data()
+        booker.book(passenger_data, legs)
+
+        with pytest.raises(ValueError, match="Seat 1A on flight AF92 is not occupied"):
+            booker.cancel(passenger_data, [(first, "12A"), (second, "1A")])
+        assert first.get_seating()[12]["A"] is not None
+
+        booker.cancel(passenger_data, legs)
+        assert first.get_seating()[12]["A"] is None
+        assert second.get_seating()[30]["C"] is None
+
+    def test_other_passengers_are_not_evicted(self, connecting_flights, standard_passenger):
+        """Test that expiry follows a reallocated passenger and cancelling leaves other passengers alone"""
+        first, second = connecting_flights
+        clock = self.FakeClock()
+        booker = ItineraryBooker(hold_ttl=60, clock=clock)
+        passenger_data = standard_passenger.passenger_data()
+        other = ("Jane", "Doe", "87654321Y")
+
+        booker.hold(passenger_data, [(first, "12A"), (second, "30C")])
+        first.reallocate_passenger("12A", "14B")
+        first.allocate_passenger("12A", other)
+        clock.now = 60
+        assert booker.expire_holds() == 1
+        assert first.get_passenger("12A") == other
+        assert first.get_passenger("14B") is None
+        assert second.get_passenger("30C") is None
+
+        booker.book(passenger_data, [(second, "30C")])
+        with pytest.raises(ValueError, match="Seat 12A on flight BA117 is not held by passenger 12345678X"):
+            booker.cancel(passenger_data, [(first, "12A"), (second, "30C")])
+        assert second.get_passenger("30C") == passenger_data
+
+    def test_concurrent_itineraries(self, connecting_flights):
+        """Test that opposite leg orders on the same flights do not deadlock"""
+        first, second = connecting_flights
+        booker = ItineraryBooker()
+
+        def book(row, legs_in_order):
+            for letter in "ABCDEF":
+                legs = [(first, f"{row}{letter}"), (second, f"{row}{letter}")]
+                if not legs_in_order:
+                    legs.reverse()
+                booker.book(("John", "Doe", "12345678X"), legs)
+
+        threads = [threading.Thread(target=book, args=(row, row % 2 == 0)) for row in range(1, 9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert first.num_available_seats() == 23 * 6 - 8 * 6
+        assert second.num_available_seats() == 56 * 9 - 8 * 6
+
+
+class TestReconcile:
+    """Test cases for comparing two states of a flight"""
+
+    def test_identical_states(self, populated_flight):
+        """Test that a flight does not differ from its snapshot"""
+        snapshot = FlightSnapshot(populated_flight)
+        assert snapshot.get_row_fingerprints() == populated_flight.get_row_fingerprints()
+        assert ManifestDiff(snapshot, populated_flight).is_empty()
+
+    def test_fingerprints_follow_seating(self, standard_flight, standard_passenger):
+        """Test that fingerprints only depend on who sits where"""
+        empty = standard_flight.get_row_fingerprints()
+        standard_flight.allocate_passenger("2B", standard_passenger.passenger_data())
+        assert standard_flight.get_row_fingerprints()[2] != 0
+        standard_flight.reallocate_passenger("2B", "3C")
+        assert standard_flight.get_row_fingerprints()[2] == 0
+        standard_flight.deallocate_passenger("3C")
+        assert standard_flight.get_row_fingerprints() == empty
+        assert standard_flight.get_fingerprint() == 0
+
+    def test_added_removed_moved_changed(self, standard_flight):
+        """Test that every kind of difference is reported"""
+        standard_flight.allocate_passenger("1A", ("Jack", "Shephard", "85994003S"))
+        standard_flight.allocate_passenger("2B", ("Kate", "Austen", "12589756P"))
+        standard_flight.allocate_passenger("3C", ("James", "Ford", "56278665F"))
+        snapshot = FlightSnapshot(standard_flight)
+
+        standard_flight.deallocate_passenger("1A")
+        standard_flight.reallocate_passenger("2B", "7F")
+        standard_flight.deallocate_passenger("3C")
+        standard_flight.allocate_passenger("3C", ("Jim", "Ford", "56278665F"))
+        standard_flight.allocate_passenger("9D", ("John", "Locke", "10265448H"))
+
+        diff = ManifestDiff(snapshot, standard_flight)
+        assert diff.get_removed() == [("1A", ("Jack", "Shephard", "85994003S"))]
+        assert diff.get_moved() == [("2B", "7F", ("Kate", "Austen", "12589756P"))]
+        assert diff.get_changed() == [("3C", ("James", "Ford", "56278665F"), ("Jim", "Ford", "56278665F"))]
+        assert diff.get_added() == [("9D", ("John", "Locke", "10265448H"))]
+
+    def test_moved_and_changed(self, standard_flight):
+        """Test that a passenger who moved and changed data is reported in both"""
+        standard_flight.allocate_passenger("1A", ("Kate", "Austen", "12589756P"))
+        snapshot = FlightSnapshot(standard_flight)
+
+        standard_flight.deallocate_passenger("1A")
+        standard_flight.allocate_passenger("3C", ("Katherine", "Austen", "12589756P"))
+
+        diff = ManifestDiff(snapshot, standard_flight)
+        assert diff.get_moved() == [("1A", "3C", ("Katherine", "Austen", "12589756P"))]
+        assert diff.get_changed() == [("3C", ("Kate", "Austen", "12589756P"), ("Katherine", "Austen", "12589756P"))]
+        assert not diff.get_added() and not diff.get_removed()
+
+    def test_diff_fleets(self, standard_aircraft, standard_passenger):
+        """Test that only the flights that differ are reported"""
+        passenger_data = standard_passenger.passenger_data()
+        ours = [Flight(number="BA1", aircraft=standard_aircraft), Flight(number="BA2", aircraft=standard_aircraft)]
+        theirs = [Flight(number="BA1", aircraft=standard_aircraft), Flight(number="BA2", aircraft=standard_aircraft),
+                  Flight(number="BA3", aircraft=standard_aircraft)]
+        for flight in ours + theirs:
+            flight.allocate_passenger("1A", passenger_data)
+        theirs[1].reallocate_passenger("1A", "1B")
+
+        diffs = diff_fleets([FlightSnapshot(flight) for flight in ours], theirs)
+        assert list(diffs) == ["BA2", "BA3"]
+        assert diffs["BA2"].get_moved() == [("1A", "1B", passenger_data)]
+        assert diffs["BA3"].get_added() == [("1A", passenger_data)]
+
+
+class TestCommandLine:
+    """Test cases for manifests and the command-line entry point"""
+
+    @pytest.fixture
+    def manifest(self, tmp_path):
+        """Write a manifest with two flights"""
+        path = tmp_path / "manifest.jsonl"
+        path.write_text(
+            '{"number": "BA117", "aircraft": {"type": "aircraft", "registration": "G-EUAH", "model": "Airbus A319", '
+            '"num_rows": 2, "num_seats_per_row": 2}, '
+            '"passengers": [{"seat": "1A", "name": "Jack", "surname": "Shephard", "id_card": "85994003S"}]}\n'
+            '\n'
+            '{"number": "AF92", "aircraft": {"type": "boeing", "registration": "F-GSPS", "airline": "Emirates"}}\n'
+        )
+        return path
+
+    def test_manifest_round_trip(self, manifest):
+        """Test loading flights from a manifest and dumping them back"""
+        with open(manifest) as lines:
+            records = list(read_manifest(lines))
+        flight = load_flight(records[0])
+        assert flight.get_seating()[1]["A"] == ("Jack", "Shephard", "85994003S")
+        assert dump_flight(flight, records[0]["aircraft"]) == records[0]
+
+    def test_invalid_manifest(self):
+        """Test that malformed manifests raise a ValueError"""
+        with pytest.raises(ValueError, match="Invalid manifest line 1"):
+            list(read_manifest(["{not json"]))
+        with pytest.raises(ValueError, match="Unknown aircraft type concorde"):
+            make_aircraft({"type": "concorde"})
+        with pytest.raises(ValueError, match="Flight record is missing 'aircraft'"):
+            load_flight({"number": "BA117"})
+
+    def test_availability(self, manifest, capsys):
+        """Test reporting the available seats of every flight"""
+        assert main(["availability", str(manifest)]) == 0
+        assert capsys.readouterr().out == "BA117\tAirbus A319\t3\nAF92\tBoeing 777\t504\n"
+
+    def test_boarding_cards_and_seatmap(self, manifest, capsys):
+        """Test rendering the boarding cards and exporting the seat map of one flight"""
+        assert main(["boarding-cards", str(manifest), "--flight", "BA117"]) == 0
+        assert "Jack Shephard 85994003S 1A BA117 Airbus A319" in capsys.readouterr().out
+
+        assert main(["seatmap", str(manifest), "--flight", "BA117"]) == 0
+        assert capsys.readouterr().out.splitlines() == [
+            "flight,seat,name,surname,id_card",
+            "BA117,1A,Jack,Shephard,85994003S",
+            "BA117,1B,,,",
+            "BA117,2A,,,",
+            "BA117,2B,,,",
+        ]
+
+    def test_allocate(self, manifest, capsys):
+        """Test allocating seats on several flights in one invocation"""
+        assert main(["allocate", str(manifest), "--book", "BA117", "2B", "Kate", "Austen", "12589756P",
+                     "--book", "AF92", "30C", "James", "Ford", "56278665F"]) == 0
+        flights = [load_flight(record) for record in read_manifest(capsys.readouterr().out.splitlines())]
+        assert flights[0].get_seating()[2]["B"] == ("Kate", "Austen", "12589756P")
+        assert flights[1].get_seating()[30]["C"] == ("James", "Ford", "56278665F")
+
+    def test_errors_exit_with_status(self, manifest, capsys):
+        """Test that invalid requests report an error instead of raising"""
+        assert main(["allocate", str(manifest), "--book", "XX1", "1A", "Kate", "Austen", "12589756P"]) == 1
+        assert "Flights not found in the manifests: XX1" in capsys.readouterr().err
+
+    def test_validation_messages_stay_out_of_output(self, manifest, capsys):
+        """Test that validation messages printed by the flights go to stderr"""
+        assert main(["allocate", str(manifest), "--book", "BA117", "99Z", "Kate", "Austen", "12589756P"]) == 1
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "Invalid row number 99" in captured.err
+        assert "error: Invalid row number 99" in captured.err
+
+    def test_allocate_refuses_double_booking(self, manifest, capsys):
+        """Test that a passenger already seated on a flight cannot be booked on it again"""
+        assert main(["allocate", str(manifest), "--book", "BA117", "2B", "Jack", "Shephard", "85994003S"]) == 1
+        assert "error: Passenger 85994003S is already booked on flight BA117 in seat 1A" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("line, message", [
+        ('[1, 2]', "Invalid manifest line 1: a flight record must be an object"),
+        ('{"number": "BA117", "aircraft": [1], "passengers": []}', "An aircraft description must be an object"),
+        ('{"number": "AF92", "aircraft": {"type": "boeing", "registration": "F-GSPS", "airline": "Emirates"}, '
+         '"passengers": "abc"}', "The passengers of a flight record must be a list"),
+        ('{"number": "AF92", "aircraft": {"type": "boeing", "registration": "F-GSPS", "airline": "Emirates"}, '
+         '"passengers": [1]}', "Every booking of flight AF92 must be an object"),
+    ])
+    def test_malformed_records_exit_with_status(self, tmp_path, capsys, line, message):
+        """Test that records of the wrong shape are reported as errors"""
+        path = tmp_path / "manifest.jsonl"
+        path.write_text(line + "\n")
+        assert main(["load", str(path)]) == 1
+        assert f"error: {message}" in capsys.readouterr().err
+
+
+class TestPassengerIndex:
+    """Test cases for the fleet-wide passenger index"""
+
+    @pytest.fixture
+    def index(self):
+        return PassengerIndex()
+
+    @pytest.fixture
+    def indexed_flights(self, index, standard_aircraft):
+        """Create two flights sharing the same index"""
+        return (Flight(number="BA117", aircraft=standard_aircraft, passenger_index=index),
+                Flight(number="AF92", aircraft=standard_aircraft, passenger_index=index))
+
+    def test_index_follows_seat_changes(self, index, indexed_flights, standard_passenger):
+        """Test that allocations, reallocations and deallocations update the index"""
+        first, second = indexed_flights
+        passenger_data = standard_passenger.passenger_data()
+        first.allocate_passenger("1A", passenger_data)
+        second.allocate_passenger("3C", passenger_data)
+        first.reallocate_passenger("1A", "2B")
+        assert index.bookings_for("12345678X") == [("BA117", "2B"), ("AF92", "3C")]
+        assert index.is_booked("12345678X", "AF92")
+
+        second.deallocate_passenger("3C")
+        assert index.bookings_for("12345678X") == [("BA117", "2B")]
+        first.deallocate_passenger("2B")
+        assert not index.is_booked("12345678X")
+        assert index.num_passengers() == 0
+
+    def test_shared_by_concurrent_flights(self, index):
+        """Test that no booking is lost when flights sharing the index change in parallel"""
+        flights = [Flight(number=f"BA{i + 1}", aircraft=Airbus(registration="G-EUAH", variant="A319-100"),
+                          passenger_index=index) for i in range(16)]
+        booker = ItineraryBooker()
+        passengers = [("Passenger", f"Number{i}", f"{i:08d}P") for i in range(50)]
+
+        def book(flight):
+            seats = list(zip(passengers, flight.find_available_seats()))
+            for passenger, seat in seats:
+                booker.book(passenger, [(flight, seat)])
+            for passenger, seat in seats[::2]:
+                booker.cancel(passenger, [(flight, seat)])
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=book, args=(flight,)) for flight in flights]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        assert all(len(index.bookings_for(passenger[2])) == 16 * (i % 2) for i, passenger in enumerate(passengers))
+        assert len(index.find_double_bookings()) == 25
+
+    def test_unknown_booking_does_not_break_flight(self, index, indexed_flights, standard_passenger):
+        """Test that seat changes go through and are published when the index lost the booking"""
+        first, _ = indexed_flights
+        passenger_data = standard_passenger.passenger_data()
+        first.allocate_passenger("1A", passenger_data)
+        index.record_deallocation("12345678X", "BA117", "1A")
+
+        first.reallocate_passenger("1A", "2B")
+        assert index.bookings_for("12345678X") == [("BA117", "2B")]
+        index.record_deallocation("12345678X", "BA117", "2B")
+        assert first.deallocate_passenger("2B") == passenger_data
+        assert [event[1] for event in first.get_event_feed().events_since(0)] == ["allocate", "reallocate", "deallocate"]
+        assert index.num_passengers() == 0
+
+    def test_rejects_double_booking_on_same_flight(self, index, indexed_flights, standard_passenger):
+        """Test that a passenger cannot hold two seats on one flight"""
+        first, _ = indexed_flights
+        first.allocate_passenger("1A", standard_passenger.passenger_data())
+        with pytest.raises(ValueError, match="Passenger 12345678X is already booked on flight BA117 in seat 1A"):
+            first.allocate_passenger("1B", standard_passenger.passenger_data())
+        assert first.get_seating()[1]["B"] is None
+        assert index.bookings_for("12345678X") == [("BA117", "1A")]
+
+    def test_double_bookings_across_flights(self, index, indexed_flights, standard_passenger):
+        """Test reporting passengers booked on several flights"""
+        first, second = indexed_flights
+        first.allocate_passenger("1A", standard_passenger.passenger_data())
+        first.allocate_passenger("1B", ("Jane", "Doe", "87654321Y"))
+        second.allocate_passenger("5E", standard_passenger.passenger_data())
+        assert index.find_double_bookings() == {"12345678X": [("BA117", "1A"), ("AF92", "5E")]}
+
+        second.deallocate_passenger("5E")
+        assert index.find_double_bookings() == {}
+
+    def test_single_flight_policy(self, standard_aircraft, standard_passenger):
+        """Test rejecting bookings on several flights when they are not allowed"""
+        index = PassengerIndex(allow_multiple_flights=False)
+        first = Flight(number="BA117", aircraft=standard_aircraft, passenger_index=index)
+        second = Flight(number="AF92", aircraft=standard_aircraft, passenger_index=index)
+        first.allocate_passenger("1A", standard_passenger.passenger_data())
+        with pytest.raises(ValueError, match="already booked on flight BA117"):
+            second.allocate_passenger("1A", standard_passenger.passenger_data())
+
+    def test_load_reports_double_bookings(self, tmp_path, capsys):
+        """Test that the load command reports passengers booked on several flights"""
+        path = tmp_path / "manifest.jsonl"
+        passengers = '[{"seat": "1A", "name": "Jack", "surname": "Shephard", "id_card": "85994003S"}]'
+        path.write_text(
+            '{"number": "BA117", "aircraft": {"type": "airbus", "registration": "G-EUAH", "variant": "A319"}, '
+            f'"passengers": {passengers}}}\n'
+            '{"number": "AF92", "aircraft": {"type": "boeing", "registration": "F-GSPS", "airline": "Emirates"}, '
+            f'"passengers": {passengers}}}\n'
+        )
+        assert main(["load", str(path)]) == 0
+        assert capsys.readouterr().out.splitlines() == [
+            "Loaded 2 flights with 2 bookings of 1 passengers",
+            "Passenger 85994003S is booked on several flights: BA117 1A, AF92 1A",
+        ]
+
+
 # Advanced scenarios
 class TestEdgeCases:
     """Test edge cases in the flight reservation system"""